@@ -0,0 +1,185 @@
+"""Broadcasts the live state of an underwater hockey game over the network.
+
+v1 - asyncio TCP server sending JSON state deltas to any number of displays
+"""
+
+import asyncio
+import json
+import threading
+
+
+class BroadcastServer:
+    """Sends score, stage and clock changes to remote displays.
+
+    Each display connects over TCP and gets one JSON object per line,
+    first the full state and then only the keys that changed. The server
+    runs its own asyncio loop on a background thread, so publish() costs
+    the Tk loop the same however many displays are connected.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8765,
+                 high_water: int = 64*1024) -> None:
+        """Create broadcast server.
+
+        host/port: address displays connect to
+        high_water: bytes waiting to be sent before a display is skipped
+        """
+        self.host = host
+        self.port = port
+        self.high_water = high_water
+        self.state = {}  # Latest full state
+        self.pending = {}  # Changes not sent yet, merged together
+        self.lock = threading.Lock()  # Guards state and pending
+        self.clients = {}  # Writer of each display, to whether it's behind
+        self.loop = None
+        self.server = None
+        self.thread = None
+
+    def start(self) -> None:
+        """Start the server on a background thread.
+
+        Raises OSError if the port can't be used
+        """
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(asyncio.start_server(
+            self.handle, self.host, self.port))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever,
+                                       name="BroadcastServer", daemon=True)
+        self.thread.start()
+        return None
+
+    def stop(self) -> None:
+        """Disconnect every display and stop the server."""
+        if self.loop is None:
+            return None
+
+        async def close() -> None:
+            self.server.close()
+            for writer in list(self.clients):
+                writer.close()
+            # Give each handler a moment to see its display disconnect
+            for i in range(100):
+                if not self.clients:
+                    break
+                await asyncio.sleep(0.01)
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
+        return None
+
+    def publish(self, state: dict) -> None:
+        """Send the keys of state that have changed to every display.
+
+        Can be called from any thread. Changes published before the server
+        gets to send them are merged into one message.
+        """
+        with self.lock:
+            changed = {key: value for key, value in state.items()
+                       if key not in self.state or self.state[key] != value}
+            if not changed:
+                return None
+            self.state.update(changed)
+            flush = not self.pending
+            self.pending.update(changed)
+        if flush and self.loop is not None:
+            # Only one flush is queued however many changes are published
+            self.loop.call_soon_threadsafe(self.flush)
+        return None
+
+    def encode(self, state: dict) -> bytes:
+        """Return a state as one line of compact JSON."""
+        return (json.dumps(state, separators=(",", ":")) + "\n").encode()
+
+    def flush(self) -> None:
+        """Send the pending changes to every display. Runs on the loop."""
+        with self.lock:
+            delta = self.encode(self.pending)
+            full = self.encode(self.state)
+            self.pending = {}
+        for writer, behind in list(self.clients.items()):
+            if behind:
+                # Display will get the full state once it catches up
+                continue
+            if writer.transport.get_write_buffer_size() > self.high_water:
+                # Display isn't keeping up, skip it rather than queueing
+                self.clients[writer] = True
+                self.loop.create_task(self.catch_up(writer))
+            else:
+                writer.write(delta)
+        return None
+
+    async def catch_up(self, writer: asyncio.StreamWriter) -> None:
+        """Wait for a slow display to drain, then send it the full state."""
+        try:
+            await writer.drain()
+        except ConnectionError:
+            return None
+        if writer in self.clients:
+            with self.lock:
+                writer.write(self.encode(self.state))
+            self.clients[writer] = False
+        return None
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """Send the full state to a new display, then keep it updated."""
+        writer.transport.set_write_buffer_limits(self.high_water)
+        with self.lock:
+            writer.write(self.encode(self.state))
+        self.clients[writer] = False
+        try:
+            # Displays don't send anything, wait for them to disconnect
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+        return None
+
+
+if __name__ == "__main__":
+    # Measure publish() cost with 50 stand-in displays connected
+    import time
+
+    server = BroadcastServer("127.0.0.1", 0)
+    server.start()
+    received = []
+
+    async def display() -> None:
+        """Stand-in display that counts the messages it receives."""
+        reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                       server.port)
+        while line := await reader.readline():
+            received.append(json.loads(line))
+            if received[-1].get("time_left") == 1:
+                break
+        writer.close()
+        await writer.wait_closed()
+
+    client_loop = asyncio.new_event_loop()
+    threading.Thread(target=client_loop.run_forever, daemon=True).start()
+    displays = [asyncio.run_coroutine_threadsafe(display(), client_loop)
+                for i in range(50)]
+    time.sleep(0.5)
+
+    times = []
+    for second in range(600, 0, -1):
+        start = time.perf_counter()
+        server.publish({"w_score": 1, "b_score": 0, "stage": "First Half",
+                        "time_left": second})
+        times.append(time.perf_counter() - start)
+        time.sleep(0.001)
+    for future in displays:
+        future.result(timeout=5)
+    server.stop()
+    times.sort()
+    print(f"{len(server.clients)} displays left, {len(received)} messages")
+    print(f"publish(): median {times[len(times)//2]*1e6:.1f} us, "
+          f"max {times[-1]*1e6:.1f} us")
@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import ttk
 
+# Background colour for each stage type
+STAGE_BG = {"Normal": "#dddddd", "Break": "#ffff00", "Timeout": "#ff0000"}
+
 
 class CustomStyle(ttk.Style):
     '''A Style object that customizes the style of ttk widgets.'''
@@ -37,79 +40,182 @@ class CustomStyle(ttk.Style):
         self.b_bg_active = "#888888"
         self.b_fg_active = "#000000"
 
+        self.applied = {}  # Options last sent to Tcl, by (method, style)
+        self.calls = 0  # Number of configure/map calls sent to Tcl
+
+        # Options for each stage type's background, by (namespace, type)
+        self.presets = {}
+
         self.theme_use('alt')
 
         self.config()
 
-    def config(self) -> None:
-        '''Configure the style options.'''
-        self.configure("TFrame", background=self.bg)
-        self.configure("box.TFrame", background=self.bd)
-
-        self.configure("TLabel", background=self.bg, foreground=self.fg,
-                       font=self.font, anchor="center")
-        self.configure("disabled.TLabel", foreground=self.disabled_fg)
-        self.configure("box.TLabel", background=self.default_box_bg,
-                       foreground=self.default_box_fg)
-        self.configure("white.box.TLabel", background=self.white_bg,
-                       foreground=self.white_fg)
-        self.configure("black.box.TLabel", background=self.black_bg,
-                       foreground=self.black_fg)
-
-        self.configure("med.box.TLabel", font=self.med_font)
-        self.configure("lrg.box.TLabel", font=self.lrg_font)
-        self.configure("med.white.box.TLabel", font=self.med_font)
-        self.configure("lrg.white.box.TLabel", font=self.lrg_font)
-        self.configure("med.black.box.TLabel", font=self.med_font)
-        self.configure("lrg.black.box.TLabel", font=self.lrg_font)
-
-        self.configure("TButton", background=self.bg, foreground=self.fg,
-                       font=self.font, anchor="center")
-        self.configure("white.TButton", background=self.white_bg,
-                       foreground=self.white_fg)
-        self.configure("black.TButton", background=self.black_bg,
-                       foreground=self.black_fg)
-        self.map(
-            "TButton",
-            background=[
-                ("active", self.bg_active)
-            ],
-            foreground=[
-                ("active", self.fg_active)
-            ]
-        )
-        self.map(
-            "white.TButton",
-            background=[
-                ("active", self.w_bg_active)
-            ],
-            foreground=[
-                ("active", self.w_fg_active)
-            ]
-        )
-        self.map(
-            "black.TButton",
-            background=[
-                ("active", self.b_bg_active)
-            ],
-            foreground=[
-                ("active", self.b_fg_active)
-            ]
-        )
-
-        self.configure("TRadiobutton", background=self.bg, foreground=self.fg,
-                       font=self.font)
-        self.map(
-            "TRadiobutton",
-            background=[
-                ("active", self.bg_active)
-            ],
-            foreground=[
-                ("active", self.fg_active)
-            ],
-            indicatorcolor=[
-                ("pressed", self.bg_active),
-                ("selected", self.bg_active)
-            ]
-        )
+    def options(self) -> dict:
+        '''Return every style option, by ("configure" or "map", style).'''
+        return {
+            ("configure", "TFrame"): {"background": self.bg},
+            ("configure", "box.TFrame"): {"background": self.bd},
+
+            ("configure", "TLabel"): {
+                "background": self.bg, "foreground": self.fg,
+                "font": self.font, "anchor": "center"
+            },
+            ("configure", "disabled.TLabel"): {
+                "foreground": self.disabled_fg
+            },
+            ("configure", "box.TLabel"): {
+                "background": self.default_box_bg,
+                "foreground": self.default_box_fg
+            },
+            ("configure", "white.box.TLabel"): {
+                "background": self.white_bg, "foreground": self.white_fg
+            },
+            ("configure", "black.box.TLabel"): {
+                "background": self.black_bg, "foreground": self.black_fg
+            },
+
+            ("configure", "med.box.TLabel"): {"font": self.med_font},
+            ("configure", "lrg.box.TLabel"): {"font": self.lrg_font},
+            ("configure", "med.white.box.TLabel"): {"font": self.med_font},
+            ("configure", "lrg.white.box.TLabel"): {"font": self.lrg_font},
+            ("configure", "med.black.box.TLabel"): {"font": self.med_font},
+            ("configure", "lrg.black.box.TLabel"): {"font": self.lrg_font},
+
+            ("configure", "TButton"): {
+                "background": self.bg, "foreground": self.fg,
+                "font": self.font, "anchor": "center"
+            },
+            ("configure", "white.TButton"): {
+                "background": self.white_bg, "foreground": self.white_fg
+            },
+            ("configure", "black.TButton"): {
+                "background": self.black_bg, "foreground": self.black_fg
+            },
+            ("map", "TButton"): {
+                "background": [("active", self.bg_active)],
+                "foreground": [("active", self.fg_active)]
+            },
+            ("map", "white.TButton"): {
+                "background": [("active", self.w_bg_active)],
+                "foreground": [("active", self.w_fg_active)]
+            },
+            ("map", "black.TButton"): {
+                "background": [("active", self.b_bg_active)],
+                "foreground": [("active", self.b_fg_active)]
+            },
+
+            ("configure", "TRadiobutton"): {
+                "background": self.bg, "foreground": self.fg,
+                "font": self.font
+            },
+            ("map", "TRadiobutton"): {
+                "background": [("active", self.bg_active)],
+                "foreground": [("active", self.fg_active)],
+                "indicatorcolor": [
+                    ("pressed", self.bg_active),
+                    ("selected", self.bg_active)
+                ]
+            }
+        }
+
+    def config(self, force: bool = False) -> None:
+        '''Configure the style options that changed since last applied.
+
+        force: configure every option, even if unchanged
+        '''
+        self.apply(self.options(), force)
+        return None
+
+    def apply(self, options: dict, force: bool = False) -> None:
+        '''Send only the options that differ from the applied ones to Tcl.'''
+        for (method, style), values in options.items():
+            applied = self.applied.setdefault((method, style), {})
+            changed = {option: value for option, value in values.items()
+                       if force or applied.get(option) != value}
+            if changed:
+                if method == "map":
+                    self.map(style, **changed)
+                else:
+                    self.configure(style, **changed)
+                applied.update(changed)
+                self.calls += 1
         return None
+
+    def add_namespace(self, namespace: str) -> str:
+        '''Add a window's own background styles, e.g. 'input.TFrame'.
+
+        Each window's background can then change without affecting the
+        others. Its frames, labels, buttons and radiobuttons that aren't
+        boxes or team colours use '{namespace}.TFrame', '.TLabel' etc.,
+        which keep the rest of the default style. Returns the frame style
+        name.
+        '''
+        for stage_type, bg in STAGE_BG.items():
+            # Precompute the options for each stage type's background
+            self.presets[namespace, stage_type] = {
+                ("configure", f"{namespace}.{widget}"): {"background": bg}
+                for widget in ("TFrame", "TLabel", "TButton", "TRadiobutton")
+            }
+        self.set_stage("Normal", namespace)
+        return f"{namespace}.TFrame"
+
+    def set_stage(self, stage_type: str, namespace: str) -> None:
+        '''Change the background colour of a window for a stage type.
+
+        stage_type: 'Normal', 'Break' or 'Timeout'
+        namespace: name given to add_namespace()
+        '''
+        self.apply(self.presets[namespace, stage_type])
+        return None
+
+
+shared = None  # The one CustomStyle used by every window
+
+
+def get_style(master: tk.Tk | tk.Frame | ttk.Frame) -> CustomStyle:
+    '''Return the shared style, creating it the first time.
+
+    Every ttk style in a process shares one Tcl style database, so the
+    theme and options only need to be set up once.
+    '''
+    global shared
+    if shared is None:
+        shared = CustomStyle(master)
+    return shared
+
+
+if __name__ == "__main__":
+    # Count Tcl calls and time style setup and stage changes
+    import time
+
+    root = tk.Tk()
+    start = time.perf_counter()
+    for i in range(3):
+        # As each of the setup, input and output frames used to
+        CustomStyle(root)
+    print(f"Style per frame: {(time.perf_counter()-start)*1000:.2f} ms")
+
+    start = time.perf_counter()
+    for i in range(3):
+        style = get_style(root)
+    print(f"Shared style: {(time.perf_counter()-start)*1000:.2f} ms")
+
+    style.add_namespace("input")
+    for i in range(20):
+        ttk.Label(root, text=f"Label {i}", style="box.TLabel").pack()
+        ttk.Button(root, text=f"Button {i}", style="input.TButton").pack()
+    root.update_idletasks()
+
+    for name, change in (
+            ("Full config", lambda t: (setattr(style, "bg", STAGE_BG[t]),
+                                       style.config(force=True))),
+            ("Incremental", lambda t: style.set_stage(t, "input"))):
+        calls = style.calls
+        start = time.perf_counter()
+        for stage_type in ["Break", "Normal", "Timeout", "Normal"] * 25:
+            change(stage_type)
+            root.update_idletasks()
+        taken = (time.perf_counter() - start) / 100
+        print(f"{name}: {(style.calls-calls)/100:.1f} Tcl calls, "
+              f"{taken*1000:.2f} ms per stage change")
+    root.destroy()
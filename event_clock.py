@@ -0,0 +1,123 @@
+"""Puts Tk event timestamps on the game clock's time base.
+
+v1 - Smallest-offset mapping of event.time, with press-to-display latency
+v1.1 - Goals confirmed through a prompt have their latency kept apart
+"""
+
+import json
+import time
+from game_clock import NS_PER_MS
+from tick_profiler import RingBuffer
+
+# A jump in the offset bigger than this is the X server's clock wrapping or
+# being reset, not an event being handled late
+RESYNC_NS = 60_000_000_000
+PRESS_MAX_NS = 5_000_000_000  # Longest a button is held before it counts
+
+
+class EventClock:
+    """Maps event.time, the X server's milliseconds when an event
+    happened, onto the monotonic time base the game clock uses.
+
+    The gap between the monotonic time an event is handled and its
+    event.time is the offset between the clocks plus how late it was
+    handled. So the smallest gap seen is the closest to the real offset,
+    and events handled late, e.g. behind a save, still get the time they
+    happened.
+    """
+
+    def __init__(self, time_source=time.monotonic_ns,
+                 size: int = 1024) -> None:
+        """Create event clock.
+
+        time_source: the game clock's time source
+        size: number of latencies kept
+        """
+        self.time_source = time_source
+        self.offset_ns = None  # Smallest monotonic - event time seen
+        self.latency = RingBuffer(size)  # Press until displayed, ns
+        # Press until displayed of goals that were confirmed first, ns,
+        # kept apart as they include the time taken to answer
+        self.confirmed = RingBuffer(size)
+
+    def to_monotonic(self, event_ms: int) -> int:
+        """Return the monotonic time of an event's event.time."""
+        offset = self.time_source() - event_ms * NS_PER_MS
+        if (self.offset_ns is None or offset < self.offset_ns or
+                offset - self.offset_ns > RESYNC_NS):
+            self.offset_ns = offset
+        return event_ms * NS_PER_MS + self.offset_ns
+
+    def press_time(self, pressed_ns: int | None) -> int:
+        """Return the monotonic time of a press, now if it wasn't given or
+        is too old to be the press that was handled, e.g. the button was
+        pressed, dragged off, then invoked from the keyboard.
+        """
+        now = self.time_source()
+        if pressed_ns is None or now - pressed_ns > PRESS_MAX_NS:
+            return now
+        return pressed_ns
+
+    def displayed(self, pressed_ns: int, confirmed: bool = False) -> None:
+        """Record the latency of a press that has now been displayed.
+
+        confirmed: True if the press was only shown once confirmed
+        """
+        latency = self.confirmed if confirmed else self.latency
+        latency.add(self.time_source() - pressed_ns)
+        return None
+
+    def summary(self) -> dict:
+        """Return the percentiles of the press-to-display latency in ms."""
+        return {
+            "presses": self.latency.count,
+            "latency_ms": {p: ns / 1e6 for p, ns in
+                           self.latency.percentiles().items()},
+            "confirmed": self.confirmed.count,
+            "confirmed_ms": {p: ns / 1e6 for p, ns in
+                             self.confirmed.percentiles().items()}
+        }
+
+    def dump(self, fp: str | None = None) -> None:
+        """Print the summary, and append it to a JSON-lines file if given."""
+        summary = self.summary()
+        print(f"{summary['presses']} presses")
+        print("  latency_ms: " + ", ".join(
+            f"p{p} {value:g}" for p, value in summary["latency_ms"].items()))
+        print(f"{summary['confirmed']} confirmed")
+        print("  confirmed_ms: " + ", ".join(
+            f"p{p} {value:g}"
+            for p, value in summary["confirmed_ms"].items()))
+        if fp is not None:
+            with open(fp, "a") as f:
+                f.write(json.dumps(summary) + "\n")
+        return None
+
+
+if __name__ == "__main__":
+    # Map event times handled late by random amounts, like a busy loop
+    import random
+
+    class FakeTime:
+        """Time source that only moves when told to."""
+
+        def __init__(self) -> None:
+            self.ns = 10**12
+
+        def __call__(self) -> int:
+            return self.ns
+
+    fake = FakeTime()
+    clock = EventClock(fake)
+    server_offset = 123_456_789_000  # X server started before we did
+    errors = []
+    for i in range(1000):
+        fake.ns += random.randrange(10**9)
+        happened = fake.ns
+        event_ms = (happened - server_offset) // NS_PER_MS
+        # Handled up to 300 ms late, as behind a messagebox or save
+        fake.ns += random.choice((0, 1, random.randrange(300))) * NS_PER_MS
+        errors.append(abs(clock.to_monotonic(event_ms) - happened))
+    # Once an event is handled on time, the offset is exact
+    print(f"Mapped time error: first event {errors[0]/1e6:.3f} ms, "
+          f"max after 10 events {max(errors[10:])/1e6:.3f} ms")
@@ -0,0 +1,251 @@
+"""A log of every event in an underwater hockey game, with snapshots.
+
+v1 - Timestamped score, correction and stage events, rebuilt after a crash
+v1.1 - A timeout still being taken keeps the game time where it stopped
+v1.2 - Lines are written and fsync'd on a writer thread, not the Tk loop
+v1.3 - Rebuilds from the snapshot before one cut off by a crash
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from game_state import GameState
+
+SNAPSHOT_EVERY = 20  # Events between snapshots
+
+
+class EventLog:
+    """Appends each game event to a JSON-lines file as it happens.
+
+    Every event has the game clock time (monotonic) and the time of day.
+    A snapshot of the whole game is written at the start and every
+    SNAPSHOT_EVERY events, so rebuild() only replays the last few events.
+
+    Lines are queued, and written and fsync'd on a writer thread, so a
+    slow disk never holds up the Tk loop. Lines queued during a fsync are
+    written together and share the next one.
+    """
+
+    def __init__(self, state: GameState, fp: str,
+                 resume: bool = False) -> None:
+        """Start a log for a game.
+
+        state: game to record, its listeners get this log added
+        resume: carry on the log at fp, e.g. after rebuild(), instead of
+                replacing it
+        """
+        self.state = state
+        self.fp = fp
+        folder = os.path.dirname(fp)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.file = open(fp, "a" if resume else "w", encoding="utf-8")
+        if resume and self.file.tell():
+            with open(fp, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Last line was cut off by a crash, start a new line
+                    self.file.write("\n")
+        self.count = 0  # Events since the last snapshot
+        self.lines = queue.Queue()  # Lines to write, then None to stop
+        self.closed = False
+        # Not a daemon, so the last lines are written before exiting
+        self.thread = threading.Thread(target=self.run, name="EventLog")
+        self.thread.start()
+        self.snapshot()
+        state.listeners.append(self.record)
+
+    def write(self, line: dict) -> None:
+        """Queue a line to be appended to the log."""
+        self.lines.put(json.dumps(line, separators=(",", ":")) + "\n")
+        return None
+
+    def run(self) -> None:
+        """Write and fsync lines until closed. Runs on the writer thread."""
+        running = True
+        while running:
+            lines = [self.lines.get()]
+            while not self.lines.empty():
+                lines.append(self.lines.get_nowait())
+            if None in lines:
+                running = False
+                lines = lines[:lines.index(None)]
+            self.file.writelines(lines)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.file.close()
+        return None
+
+    def stamp(self) -> dict:
+        """Return the game clock and wall clock time now."""
+        return {"elapsed_ns": self.state.clock.elapsed_ns(),
+                "wall_ns": time.time_ns()}
+
+    def snapshot(self) -> None:
+        """Write the whole state of the game."""
+        self.write({"kind": "snapshot", **self.stamp(),
+                    "state": self.state.checkpoint()})
+        self.count = 0
+        return None
+
+    def record(self, kind: str, data: dict) -> None:
+        """Write one event. Used as a GameState listener."""
+        self.write({"kind": kind, **self.stamp(), **data})
+        self.count += 1
+        if kind == "end":
+            self.close()
+        elif self.count >= SNAPSHOT_EVERY:
+            self.snapshot()
+        return None
+
+    def close(self) -> None:
+        """Stop recording, the log is closed once its lines are written."""
+        if self.record in self.state.listeners:
+            self.state.listeners.remove(self.record)
+        if not self.closed:
+            self.closed = True
+            self.lines.put(None)
+        return None
+
+
+def log_path(game: int, folder: str = "games") -> str:
+    """Return the file path of a game's event log."""
+    return os.path.join(folder, f"game_{game}.jsonl")
+
+
+def find_unfinished(folder: str = "games") -> str | None:
+    """Return the most recent log of a game that didn't end, or None."""
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return None
+    paths = [os.path.join(folder, name) for name in names
+             if name.endswith(".jsonl")]
+    for fp in sorted(paths, key=os.path.getmtime, reverse=True):
+        if unfinished(fp):
+            return fp
+    return None
+
+
+def tail(fp: str, chunk: int = 4096) -> list[dict]:
+    """Return the lines of a log from the last whole snapshot onwards.
+
+    Reads backwards from the end of the file, so only the end is read
+    however long the game has been running. A snapshot cut off by a crash
+    is skipped for the one before it.
+    """
+    marker = b'\n{"kind":"snapshot"'
+    with open(fp, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while True:
+            position = max(position - chunk, 0)
+            f.seek(position)
+            data = f.read(end - position)
+            if position == 0:
+                # The log starts with a snapshot
+                data = b"\n" + data
+            start = data.rfind(marker)
+            while start != -1 and not whole(data, start + 1):
+                start = data.rfind(marker, 0, start)
+            if start != -1:
+                data = data[start+1:]
+                break
+            if position == 0:
+                # No snapshot was written whole
+                return []
+    lines = []
+    for line in data.splitlines():
+        try:
+            lines.append(json.loads(line))
+        except json.decoder.JSONDecodeError:
+            # Last line was cut off by a crash
+            continue
+    return lines
+
+
+def whole(data: bytes, start: int) -> bool:
+    """Return True if the line starting at start is valid JSON."""
+    stop = data.find(b"\n", start)
+    try:
+        json.loads(data[start:None if stop == -1 else stop])
+    except json.decoder.JSONDecodeError:
+        return False
+    return True
+
+
+def unfinished(fp: str) -> bool:
+    """Return True if the log is for a game that hasn't ended."""
+    try:
+        lines = tail(fp)
+    except FileNotFoundError:
+        return False
+    return (bool(lines) and lines[-1]["kind"] != "end" and
+            not lines[0]["state"]["finished"])
+
+
+def rebuild(fp: str, time_source=time.monotonic_ns) -> GameState:
+    """Rebuild a game from its log, replaying events after the snapshot.
+
+    The clock carries on from the last event, plus the real time since
+    it, as the game kept being played while the scorer was down. Unless a
+    timeout was being taken, then it carries on from the last event.
+    """
+    lines = tail(fp)
+    snapshot = lines[0]
+    last = lines[-1]
+    since_ns = max(time.time_ns() - last["wall_ns"], 0)
+    state = GameState.restore(snapshot["state"], last["elapsed_ns"] +
+                              since_ns, time_source)
+    for line in lines[1:]:
+        state.apply(line["kind"], line)
+    if state.timeout is not None:
+        state.clock.start_ns += since_ns
+    return state
+
+
+if __name__ == "__main__":
+    # Time rebuilding a long game from its log
+    import random
+    import tempfile
+
+    class FakeTime:
+        """Time source that only moves when told to."""
+
+        def __init__(self) -> None:
+            self.ns = 0
+
+        def __call__(self) -> int:
+            return self.ns
+
+    fake = FakeTime()
+    state = GameState(10, 2, "Golden Goal", time_source=fake)
+    state.start()
+    fp = os.path.join(tempfile.mkdtemp(), "game_1.jsonl")
+    log = EventLog(state, fp)
+    events = 0
+    taken = 0
+    for i in range(2000):
+        fake.ns += 500_000_000
+        state.tick()
+        start = time.perf_counter()
+        if random.random() < 0.2:
+            state.add_score(random.choice("wb"))
+            events += 1
+        elif random.random() < 0.05:
+            state.remove_score(random.choice("wb"))
+            events += 1
+        taken += time.perf_counter() - start
+    print(f"Event on the Tk thread: {taken/events*1e6:.1f} us")
+    log.close()  # As if the scorer crashed, without an end event
+    log.thread.join()
+
+    start = time.perf_counter()
+    rebuilt = rebuild(fp)
+    taken = time.perf_counter() - start
+    print(f"Log: {os.path.getsize(fp)/1024:.0f} KiB, rebuilt in "
+          f"{taken*1000:.2f} ms")
+    assert (rebuilt.w_score, rebuilt.b_score, rebuilt.stage_index) == (
+        state.w_score, state.b_score, state.stage_index)
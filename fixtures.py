@@ -0,0 +1,213 @@
+"""Tournament fixtures for underwater hockey games across several courts.
+
+v1 - Round-robin, pools and knockout draws, scheduled onto courts
+"""
+
+from collections import namedtuple
+from timeline import Timeline
+
+# A game to be played, before it is given a time and court
+# group: e.g. 'Round Robin', 'Pool A' or 'Final'
+# w_team/b_team: team names, or the key of the match whose winner plays
+# key: unique id other matches use to refer to this one's winner
+Match = namedtuple("Match", ["group", "round", "w_team", "b_team", "key"])
+
+
+class Fixture(namedtuple("Fixture", ["game", "court", "start", "group",
+                                     "round", "w_team", "b_team"])):
+    """A scheduled game. start is minutes after the first game starts."""
+
+    __slots__ = ()
+
+    def input_args(self, setup: dict) -> dict:
+        """Return InputFrame arguments to play this fixture.
+
+        setup: game length arguments from SetupFrame, e.g. time and half
+        """
+        return {**setup, "w_team": self.w_team, "b_team": self.b_team,
+                "game": self.game}
+
+
+def game_slot(setup: dict, changeover: int = 5) -> int:
+    """Return the minutes to allow for each game, including extra time.
+
+    setup: game length arguments from SetupFrame, e.g. time and half
+    changeover: minutes between games on the same court
+    """
+    timeline = Timeline(setup.get("time", 10), setup.get("half", 2),
+                        setup.get("overtime", "No Overtime"),
+                        setup.get("ot_time", 0), setup.get("ot_break", 0))
+    return timeline.length(overtime=True) // 60 + changeover
+
+
+def round_robin(teams: list, group: str = "Round Robin") -> list[Match]:
+    """Return matches for every team to play every other team once.
+
+    Uses the circle method, so each round has every team playing at most
+    once, and teams swap between white and black each round.
+    """
+    teams = list(teams)
+    if len(teams) % 2:
+        teams.append(None)  # Bye
+    half = len(teams) // 2
+    matches = []
+    for round_no in range(len(teams) - 1):
+        for i in range(half):
+            w_team, b_team = teams[i], teams[-1-i]
+            if w_team is None or b_team is None:
+                continue
+            if (round_no + i) % 2:
+                w_team, b_team = b_team, w_team
+            matches.append(Match(group, round_no + 1, w_team, b_team,
+                                 f"{group} {len(matches)+1}"))
+        # Keep the first team fixed and rotate the rest
+        teams.insert(1, teams.pop())
+    return matches
+
+
+def pools(teams: list, count: int) -> list[Match]:
+    """Split teams into pools by seed and return each pool's round-robin.
+
+    Seeds are snaked across the pools (A B C C B A ...) to balance them.
+    Matches are ordered by round so pools play alongside each other.
+    """
+    groups = [[] for i in range(count)]
+    for seed, team in enumerate(teams):
+        lap, place = divmod(seed, count)
+        groups[place if lap % 2 == 0 else count-1-place].append(team)
+    matches = []
+    for i, group in enumerate(groups):
+        matches += round_robin(group, f"Pool {chr(ord('A') + i)}")
+    return sorted(matches, key=lambda match: match.round)
+
+
+def knockout(seeds: list) -> list[Match]:
+    """Return a single elimination bracket for seeded teams.
+
+    seeds: teams in seed order, or placeholders such as 'Pool A 1st'.
+    Top seeds get byes if the number of teams isn't a power of 2.
+    Later rounds refer to the key of the match whose winner plays.
+    """
+    size = 1
+    while size < len(seeds):
+        size *= 2
+    # Standard bracket order, so the top two seeds can only meet in the final
+    order = [1]
+    while len(order) < size:
+        order = [seed for pair in order
+                 for seed in (pair, 2*len(order) + 1 - pair)]
+    entrants = [seeds[seed-1] if seed <= len(seeds) else None
+                for seed in order]
+
+    names = {2: "Final", 4: "Semi-Final", 8: "Quarter-Final"}
+    matches = []
+    round_no = 1
+    while len(entrants) > 1:
+        group = names.get(len(entrants), f"Round of {len(entrants)}")
+        winners = []
+        for i in range(0, len(entrants), 2):
+            w_team, b_team = entrants[i], entrants[i+1]
+            if b_team is None:
+                winners.append(w_team)  # Bye
+                continue
+            key = f"{group} {i//2 + 1}"
+            matches.append(Match(group, round_no, w_team, b_team, key))
+            winners.append(key)
+        entrants = winners
+        round_no += 1
+    return matches
+
+
+def schedule(matches: list[Match], courts: int, slot: int,
+             rest: int = 1, first_game: int = 1) -> list[Fixture]:
+    """Give each match a court, start time and game number.
+
+    courts: number of courts games are played on at once
+    slot: minutes per game, see game_slot()
+    rest: time slots a team must sit out between games
+    Games are filled in time slot by time slot, taking the earliest
+    matches whose teams have rested and whose feeder matches are done.
+    """
+    # Teams that are placeholders for the winner of a match, or for a
+    # place in a group, e.g. 'Pool A 1st', and the matches they wait for
+    groups = {}
+    for match in matches:
+        groups.setdefault(match.group, []).append(match.key)
+    keys = {match.key for match in matches}
+    depends = {}
+    for match in matches:
+        for team in (match.w_team, match.b_team):
+            if team in keys:
+                depends[team] = [team]
+            elif team.rsplit(" ", 1)[0] in groups:
+                depends[team] = groups[team.rsplit(" ", 1)[0]]
+
+    def rested(name: str) -> bool:
+        """Return True if a team or match has rested long enough."""
+        return name not in last_slot or slot_no - last_slot[name] > rest
+
+    last_slot = {}  # Last time slot each team or match key was in
+    game_of = {}  # Game number of each match key
+    pending = list(matches)
+    fixtures = []
+    game = first_game
+    slot_no = 0
+    last_played = 0  # Last time slot any game was scheduled in
+    while pending:
+        playing = set()  # Teams in this time slot
+        waiting = []
+        for match in pending:
+            teams = (match.w_team, match.b_team)
+            ready = len(playing) < 2*courts and all(
+                team not in playing and rested(team) and
+                all(key in last_slot and rested(key)
+                    for key in depends.get(team, []))
+                for team in teams)
+            if not ready:
+                waiting.append(match)
+                continue
+            playing.update(teams)
+            for name in (*teams, match.key):
+                last_slot[name] = slot_no
+            game_of[match.key] = game
+            fixtures.append(Fixture(game, len(playing) // 2, slot_no*slot,
+                                    match.group, match.round, *teams))
+            game += 1
+        if playing:
+            last_played = slot_no
+        elif slot_no - last_played > rest:
+            # Nothing has been playable since every team has rested
+            raise ValueError("Matches can't be scheduled, check placeholders")
+        pending = waiting
+        slot_no += 1
+
+    # Replace match keys with the game whose winner plays
+    return [fixture._replace(
+        w_team=(f"Winner G{game_of[fixture.w_team]}"
+                if fixture.w_team in keys else fixture.w_team),
+        b_team=(f"Winner G{game_of[fixture.b_team]}"
+                if fixture.b_team in keys else fixture.b_team))
+        for fixture in fixtures]
+
+
+if __name__ == "__main__":
+    # Benchmark scheduling large leagues
+    import time
+
+    setup = {"time": 10, "half": 2}
+    for teams, courts in ((8, 1), (16, 3), (32, 4), (64, 6)):
+        names = [f"T{i:02}" for i in range(1, teams+1)]
+        draws = {
+            "Round robin": round_robin(names),
+            "Pools + knockout": (pools(names, teams // 4) +
+                                 knockout([f"Pool {chr(ord('A') + i)} 1st"
+                                           for i in range(teams // 4)]))
+        }
+        for name, matches in draws.items():
+            start = time.perf_counter()
+            fixtures = schedule(matches, courts, game_slot(setup))
+            taken = time.perf_counter() - start
+            hours = (fixtures[-1].start + game_slot(setup)) / 60
+            print(f"{teams} teams, {courts} courts, {name}: "
+                  f"{len(fixtures)} games over {hours:.1f} h, "
+                  f"scheduled in {taken*1000:.1f} ms")
@@ -0,0 +1,90 @@
+"""Finds the largest font that fits text in a box, for big displays.
+
+v1 - Binary search over cached fonts, results memoised per box size
+"""
+
+import tkinter as tk
+import tkinter.font as tkfont
+
+RESIZE_DELAY_MS = 150  # Wait for a drag or full screen to settle first
+# Digits are all the same width, so '12:34' fits wherever '00:00' does
+SHAPE = str.maketrans("123456789", "000000000")
+
+
+class FontFitter:
+    """Sizes fonts to fill boxes, e.g. the clock and scores on a projector.
+
+    Each size's font and measurements are cached, and the size found for a
+    shape of text in a box is memoised, so resizing back to a size seen
+    before, e.g. toggling full screen, doesn't measure anything.
+    """
+
+    def __init__(self, master: tk.Misc, family: str = "Arial",
+                 minimum: int = 8, maximum: int = 1200) -> None:
+        """Create font fitter.
+
+        family: font family of every size
+        minimum/maximum: range of sizes searched, in pixels
+        """
+        self.master = master
+        self.family = family
+        self.minimum = minimum
+        self.maximum = maximum
+        self.fonts = {}  # Font of each pixel size, used to measure
+        self.heights = {}  # Line height of each size
+        self.widths = {}  # Width of (size, text)
+        self.fits = {}  # Size found for (text shape, width, height)
+
+    def font(self, size: int) -> tkfont.Font:
+        """Return the font of a pixel size, made the first time."""
+        if size not in self.fonts:
+            # Negative sizes are in pixels, so they compare with box sizes
+            self.fonts[size] = tkfont.Font(self.master, family=self.family,
+                                           size=-size)
+        return self.fonts[size]
+
+    def fits_in(self, text: str, size: int, width: int,
+                height: int) -> bool:
+        """Return True if text in a font size fits in a box."""
+        if size not in self.heights:
+            self.heights[size] = self.font(size).metrics("linespace")
+        if self.heights[size] > height:
+            return False
+        if (size, text) not in self.widths:
+            self.widths[size, text] = self.font(size).measure(text)
+        return self.widths[size, text] <= width
+
+    def fit(self, text: str, width: int, height: int) -> int:
+        """Return the largest pixel size text fits in a box with."""
+        shape = text.translate(SHAPE)
+        key = (shape, width, height)
+        if key not in self.fits:
+            # Largest size that fits is between low and high
+            low, high = self.minimum, self.maximum
+            while low < high:
+                size = (low + high + 1) // 2
+                if self.fits_in(shape, size, width, height):
+                    low = size
+                else:
+                    high = size - 1
+            self.fits[key] = low
+        return self.fits[key]
+
+
+if __name__ == "__main__":
+    # Time fitting the clock to full screen, first time and memoised
+    import time
+
+    root = tk.Tk()
+    fitter = FontFitter(root)
+    for width, height in ((1280, 720), (1920, 1080), (3840, 2160)):
+        box = (width // 3, height // 2)
+        start = time.perf_counter()
+        size = fitter.fit("10:00", *box)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        fitter.fit("09:59", *box)
+        again = time.perf_counter() - start
+        print(f"{width}x{height}: {size} px, first {first*1000:.2f} ms, "
+              f"memoised {again*1e6:.1f} us")
+    root.destroy()
@@ -0,0 +1,242 @@
+"""A drift-free game clock for an underwater hockey game.
+
+v1 - Monotonic clock that wakes up on each whole-second boundary
+v1.1 - Can start from a given time, to line up with another clock
+v1.2 - Ticks can be timed by a TickProfiler
+v1.3 - Can wake up every tenth of a second when needed
+v1.4 - Also wakes up for deadlines between interval boundaries
+v1.5 - Can be paused, e.g. for timeouts, without the time jumping
+v1.6 - Gives the elapsed time at an earlier time, e.g. a button press
+v1.7 - Wakes up for deadlines while paused, e.g. a timeout ending
+"""
+
+import time
+from math import ceil
+
+NS_PER_SEC = 1_000_000_000
+NS_PER_MS = 1_000_000
+NS_PER_TENTH = NS_PER_SEC // 10
+
+
+class GameClock:
+    """Clock that measures elapsed game time on the monotonic time base.
+
+    Unlike datetime.now(), time.monotonic_ns() isn't affected by NTP or
+    daylight saving changes. Each wake-up is scheduled for the next whole
+    second after the start, so late callbacks never add up over a game.
+
+    Pausing keeps a running sum of the time spent paused, so the elapsed
+    time costs the same however many timeouts there have been.
+    """
+
+    def __init__(self, master=None, callback=None,
+                 time_source=time.monotonic_ns) -> None:
+        """Create game clock.
+
+        master: tkinter widget used to schedule wake-ups with after()
+        callback: called with the whole seconds elapsed on each wake-up
+        time_source: function returning the current time in nanoseconds
+        """
+        self.master = master
+        self.callback = callback
+        self.time_source = time_source
+        self.start_ns = None  # Time the clock was started
+        self.after_id = None  # Id of the scheduled wake-up
+        self.due_ns = None  # Elapsed time the next wake-up is due at
+        self.running = False
+        # Time between wake-ups, NS_PER_TENTH while tenths are shown
+        self.interval_ns = NS_PER_SEC
+        # Function returning the elapsed time of the next deadline, e.g. a
+        # penalty ending, or None. Wakes up for it if before the interval
+        self.deadline = None
+        # Function returning the time-source time of the next deadline
+        # while paused, e.g. a timeout ending, or None
+        self.pause_deadline = None
+        self.paused_ns = 0  # Total time spent paused, before paused_at
+        self.paused_at = None  # Time the clock was paused, None if running
+
+        # Jitter is how late each wake-up was after its second boundary
+        self.ticks = 0
+        self.max_jitter_ns = 0
+        self.total_jitter_ns = 0
+        self.profiler = None  # TickProfiler timing each tick, if any
+
+    def start(self, start_ns: int | None = None) -> None:
+        """Start the clock and schedule the first wake-up.
+
+        start_ns: time to count from, now if None. Used to line clocks up
+        """
+        self.start_ns = self.time_source() if start_ns is None else start_ns
+        self.running = True
+        self.tick()
+        return None
+
+    def stop(self) -> None:
+        """Stop the clock from waking up."""
+        self.running = False
+        if self.after_id is not None and self.master is not None:
+            self.master.after_cancel(self.after_id)
+        self.after_id = None
+        return None
+
+    def pause(self) -> None:
+        """Stop the elapsed time from counting, e.g. for a timeout.
+
+        The clock still wakes up once a second of the pause.
+        """
+        if self.paused_at is None:
+            self.paused_at = self.time_source()
+            self.reschedule()
+        return None
+
+    def resume(self) -> int:
+        """Carry on counting from where the clock was paused.
+
+        Returns the nanoseconds it was paused for
+        """
+        if self.paused_at is None:
+            return 0
+        paused = self.time_source() - self.paused_at
+        self.paused_ns += paused
+        self.paused_at = None
+        self.reschedule()
+        return paused
+
+    def reschedule(self) -> None:
+        """Move the next wake-up, after pausing or resuming."""
+        if self.after_id is not None and self.master is not None:
+            self.master.after_cancel(self.after_id)
+            self.due_ns = None
+            self.after_id = self.master.after(self.ms_to_next_tick(),
+                                              self.tick)
+        return None
+
+    def paused_for_ns(self) -> int:
+        """Return the nanoseconds since the clock was paused, or 0."""
+        if self.paused_at is None:
+            return 0
+        return self.time_source() - self.paused_at
+
+    def elapsed_ns(self) -> int:
+        """Return the nanoseconds elapsed since the clock started.
+
+        Time spent paused isn't counted.
+        """
+        now = self.time_source() if self.paused_at is None else self.paused_at
+        return now - self.start_ns - self.paused_ns
+
+    def elapsed_at_ns(self, time_ns: int) -> int:
+        """Return the nanoseconds elapsed at a time on the time source.
+
+        Only pauses up to now are taken off, so it is for recent times,
+        e.g. when a button was pressed
+        """
+        if self.paused_at is not None:
+            time_ns = min(time_ns, self.paused_at)
+        return time_ns - self.start_ns - self.paused_ns
+
+    def real_ns(self) -> int:
+        """Return the nanoseconds since the clock started, with pauses."""
+        return self.time_source() - self.start_ns
+
+    def elapsed(self) -> int:
+        """Return the whole seconds elapsed since the clock started.
+
+        0 if the clock was started from a time that hasn't come yet
+        """
+        return max(self.elapsed_ns() // NS_PER_SEC, 0)
+
+    def ms_to_next_second(self) -> int:
+        """Return the milliseconds until the next whole-second boundary.
+
+        Rounded up so the wake-up is never before the boundary.
+        """
+        remaining = NS_PER_SEC - self.elapsed_ns() % NS_PER_SEC
+        return ceil(remaining / NS_PER_MS)
+
+    def next_due_ns(self) -> int:
+        """Return the elapsed time of the next interval boundary, or the
+        next deadline if that is sooner.
+        """
+        elapsed_ns = self.elapsed_ns()
+        due_ns = elapsed_ns + self.interval_ns - elapsed_ns % self.interval_ns
+        deadline = self.deadline() if self.deadline is not None else None
+        if deadline is not None and deadline > elapsed_ns:
+            due_ns = min(due_ns, deadline)
+        return due_ns
+
+    def ms_to_next_tick(self) -> int:
+        """Return the milliseconds until the next wake-up is due.
+
+        Rounded up so the wake-up is never before it. While paused, wakes
+        up on each whole second of the pause instead, or the pause
+        deadline if that is sooner.
+        """
+        if self.paused_at is not None:
+            remaining = NS_PER_SEC - self.paused_for_ns() % NS_PER_SEC
+            deadline = (self.pause_deadline()
+                        if self.pause_deadline is not None else None)
+            if deadline is not None:
+                remaining = min(remaining,
+                                max(deadline - self.time_source(), 0))
+            return ceil(remaining / NS_PER_MS)
+        return ceil((self.next_due_ns() - self.elapsed_ns()) / NS_PER_MS)
+
+    def tick(self) -> None:
+        """Run the callback, then schedule the next wake-up."""
+        self.after_id = None  # This wake-up has come
+        elapsed_ns = self.elapsed_ns()
+        jitter = 0
+        if self.ticks and self.due_ns is not None and self.paused_at is None:
+            # The first tick is the start, not a scheduled wake-up
+            jitter = max(elapsed_ns - self.due_ns, 0)
+            self.max_jitter_ns = max(self.max_jitter_ns, jitter)
+            self.total_jitter_ns += jitter
+        self.ticks += 1
+
+        if self.profiler is not None:
+            self.profiler.begin(jitter)
+        if self.callback is not None:
+            self.callback(elapsed_ns // NS_PER_SEC)
+        if self.profiler is not None:
+            self.profiler.end()
+
+        # The callback may have stopped the clock, e.g. at game end
+        self.due_ns = self.next_due_ns() if self.paused_at is None else None
+        if self.running and self.master is not None:
+            self.after_id = self.master.after(self.ms_to_next_tick(),
+                                              self.tick)
+        return None
+
+    def jitter(self) -> dict:
+        """Return the mean and max wake-up lateness in milliseconds."""
+        wakeups = max(self.ticks - 1, 1)
+        return {
+            "ticks": self.ticks,
+            "mean_ms": self.total_jitter_ns / wakeups / NS_PER_MS,
+            "max_ms": self.max_jitter_ns / NS_PER_MS
+        }
+
+
+if __name__ == "__main__":
+    # Measure the jitter bound and CPU use without Tk, sleeping instead of
+    # after(), waking once a second and then every tenth of a second
+    import sys
+    from game_state import GameState
+
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for interval_ns in (NS_PER_SEC, NS_PER_TENTH):
+        # A game in its final minute, so tenths are worked out every tick
+        state = GameState(1, 0)
+        state.start()
+        clock = GameClock(callback=lambda elapsed: (state.tick(elapsed),
+                                                    state.tenths()))
+        clock.interval_ns = interval_ns
+        cpu = time.process_time()
+        clock.start()
+        while clock.elapsed() < seconds:
+            time.sleep(clock.ms_to_next_tick() / 1000)
+            clock.tick()
+        cpu = time.process_time() - cpu
+        print(f"{NS_PER_SEC // interval_ns} Hz, {seconds} s measured: "
+              f"CPU {cpu / seconds * 100:.3f}%,", clock.jitter())
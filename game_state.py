@@ -0,0 +1,491 @@
+"""The state of an underwater hockey game, without any tkinter.
+
+v1 - Scores, stages and overtime rules, with an injectable time source
+v1.1 - Reports each event to listeners, can be restored from a snapshot
+v1.2 - Gives the clock in tenths in the final minute and golden goal
+v1.3 - Timed penalties for any number of players, paused over breaks
+v1.4 - Timeouts pause the clock, and each one is kept with the result
+v1.5 - Goals are recorded at the game time they were scored
+v1.6 - Timed timeouts end on a timer, not by checking every tick
+"""
+
+import time as time_module
+from datetime import datetime
+from game_clock import GameClock, NS_PER_SEC, NS_PER_TENTH
+from timeline import Timeline
+from timer_queue import TimerQueue
+
+# Stages of play, as opposed to breaks, whose final minute shows tenths
+PLAYING = ("First Half", "Second Half", "Extra Time 1st Half",
+           "Extra Time 2nd Half", "Golden Goal")
+TENTHS_FROM = 60  # Seconds left when tenths start being shown
+# Length of each kind of timeout in seconds, None if until the ref resumes
+TIMEOUTS = {"Referee": None, "White": 60, "Black": 60}
+
+
+class GameState:
+    """Scores, stage and clock of an underwater hockey game.
+
+    Can be run from scripts and tests, or viewed by InputFrame/OutputFrame
+    """
+
+    def __init__(self, time: int = 10, half: int = 2,
+                 overtime: str = "No Overtime", ot_time: int = 0,
+                 ot_break: int = 0, w_team: str = "WHITE TEAM",
+                 b_team: str = "BLACK TEAM", game: int = 1,
+                 time_source=time_module.monotonic_ns) -> None:
+        """Create game state.
+
+        time: length of each half of the game
+        half: length of half-time
+        overtime: "No Overtime", "Extra Time" or "Golden Goal"
+        ot_time: length of each half of overtime
+        ot_break: time between overtime halves
+        w_team: abbreviated white team name
+        b_team: abbreviated black team name
+        game: game number
+        time_source: function returning the current time in nanoseconds
+        """
+        self.time = time  # Length of each half of the game
+        self.half = half  # Length of half-time
+        self.overtime = overtime  # Overtime procedure when game ends in a tie
+        self.ot_time = ot_time  # Length of each half of overtime
+        self.ot_break = ot_break  # Time between overtime halves
+        self.w_team = w_team
+        self.b_team = b_team
+        self.game = game  # Game number
+
+        self.w_score = 0
+        self.b_score = 0
+        self.finished = False  # Set once the game has ended
+
+        # All stages of the game, and the current stage
+        self.timeline = Timeline(time, half, overtime, ot_time, ot_break)
+        self.stage_index = 0
+        self.stage = self.timeline.stages[0]
+        self.time_left = self.stage.end  # Seconds shown on the clock
+
+        self.clock = GameClock(time_source=time_source)
+        self.clock.deadline = self.next_deadline
+        self.start_time = None
+
+        # Timed penalties, by key e.g. 'w1', fired by the game clock
+        self.timers = TimerQueue()
+        self.penalties = {}  # Colour of each player serving a penalty
+        self.penalty_count = 0  # Penalties given, to number them
+
+        self.timeout = None  # Kind of timeout being taken, see TIMEOUTS
+        # End of the timed timeout being taken. On the time source, as the
+        # game clock is stopped during it
+        self.pause_timers = TimerQueue()
+        self.clock.pause_deadline = self.pause_timers.next_deadline
+        # Every timeout taken, with its type, stage, game time it started
+        # at and length in seconds, saved with the result
+        self.timeouts = []
+
+        # Called with (kind, data) on each score, correction, stage change
+        # and game end, e.g. by an EventLog
+        self.listeners = []
+
+    def start(self, start_ns: int | None = None) -> None:
+        """Start the game clock.
+
+        start_ns: clock time the game starts at, now if None
+        """
+        self.start_time = datetime.now()
+        self.clock.start(start_ns)
+        return None
+
+    def record(self, kind: str, **data) -> None:
+        """Tell the listeners about an event."""
+        for listener in self.listeners:
+            listener(kind, data)
+        return None
+
+    def apply(self, kind: str, data: dict) -> None:
+        """Change the state as a recorded event did, to replay it."""
+        if kind == "score":
+            self.add_points(data["colour"], 1)
+        elif kind == "correction":
+            self.add_points(data["colour"], -1)
+        elif kind == "stage":
+            self.enter_stage(data["index"])
+        elif kind == "penalty":
+            self.start_penalty(data["key"], data["colour"],
+                               data["deadline_ns"])
+        elif kind == "penalty_end":
+            self.penalties.pop(data["key"], None)
+            self.timers.cancel(data["key"])
+        elif kind == "timeout":
+            self.stop_clock(data["type"])
+        elif kind == "timeout_end":
+            self.timeout = None
+            self.pause_timers.cancel("timeout")
+            self.clock.resume()
+            self.timeouts.append({key: data[key] for key in
+                                  ("type", "stage", "start", "length")})
+        elif kind == "end":
+            self.finished = True
+        return None
+
+    def tied(self) -> bool:
+        """Return True if the scores are level."""
+        return self.w_score == self.b_score
+
+    def tick(self, elapsed: int | None = None) -> bool:
+        """Advance the game to a time, catching up on missed stage ends.
+
+        elapsed: whole seconds since the start, read from the clock if None
+        Returns True if the stage changed
+        """
+        if self.finished:
+            return False
+        # A team's timeout that is up ends
+        self.pause_timers.fire(self.clock.time_source())
+        if elapsed is None or self.timeout is not None:
+            # The clock's callback gives the time it woke up, but the time
+            # may have been paused or resumed since
+            elapsed = self.clock.elapsed()
+
+        index, remaining = self.timeline.lookup(elapsed)
+        changed = False
+        while self.stage_index < index:
+            # Penalties up before the stage ended come off first
+            self.timers.fire(self.stage.end * NS_PER_SEC)
+            if not self.next_stage():
+                # Game has ended
+                self.time_left = 0
+                self.record("end")
+                return changed
+            changed = True
+        self.timers.fire(self.clock.elapsed_ns())
+
+        if remaining is None:
+            # In golden goal, time counts upward from 0:00
+            self.time_left = elapsed - self.stage.start
+        else:
+            # Time left until the end of the half/break, counts down
+            self.time_left = remaining
+        return changed
+
+    def tenths(self) -> int | None:
+        """Return the clock in tenths of a second, if it should show them.
+
+        Counts down to the end of the final minute of a half, and up from
+        the start of golden goal. None the rest of the time
+        """
+        if self.finished or self.stage.name not in PLAYING:
+            return None
+        elapsed_ns = self.clock.elapsed_ns()
+        if self.stage.end is None:
+            return (elapsed_ns - self.stage.start*NS_PER_SEC) // NS_PER_TENTH
+        remaining = self.stage.end*NS_PER_SEC - elapsed_ns
+        if remaining > TENTHS_FROM*NS_PER_SEC:
+            return None
+        # Rounded up, as the whole seconds are
+        return max(-(-remaining // NS_PER_TENTH), 0)
+
+    def next_stage(self) -> bool:
+        """Move on to the next stage when the current one ends.
+
+        Returns False if the game has ended instead
+        """
+        index = self.stage_index + 1
+        if index == len(self.timeline.stages):
+            # No stages left
+            self.finished = True
+            return False
+        stage = self.timeline.stages[index]
+        if stage.if_tied and not self.tied():
+            # Overtime procedures are only used when the game is tied
+            self.finished = True
+            return False
+
+        self.enter_stage(index)
+        self.record("stage", index=index)
+        return True
+
+    def enter_stage(self, index: int) -> None:
+        """Move to a stage, pausing penalties over breaks."""
+        self.stage_index = index
+        self.stage = self.timeline.stages[index]
+        if self.stage.name not in PLAYING and self.stage.end is not None:
+            # Penalty time is only served during play
+            self.timers.delay((self.stage.end - self.stage.start) *
+                              NS_PER_SEC)
+        return None
+
+    def next_deadline(self) -> int | None:
+        """Return the clock time of the next stage end or penalty end.
+
+        The clock doesn't move during a timeout, so a timeout's end is
+        given by pause_timers instead, on the time source.
+        """
+        deadlines = [self.timers.next_deadline()]
+        if self.stage.end is not None:
+            deadlines.append(self.stage.end * NS_PER_SEC)
+        return min((deadline for deadline in deadlines
+                    if deadline is not None), default=None)
+
+    def stage_at(self, seconds: int) -> str:
+        """Return the name of the stage at a game time, e.g. of a goal."""
+        index, remaining = self.timeline.lookup(seconds)
+        return self.timeline.stages[min(index,
+                                        len(self.timeline.stages) - 1)].name
+
+    def confirm_message(self) -> str | None:
+        """Return a message if a goal now is likely a mistake, else None."""
+        if self.stage.name in ("Half-Time", "Extra Half-Time",
+                               "Extra Time Break"):
+            return "It is half-time. Add score anyway?"
+        elif self.timeout is not None:
+            return "Game is on a timeout. Add score anyway?"
+        return None
+
+    def add_score(self, colour: str, goal_ns: int | None = None) -> None:
+        """Add score to one of the teams.
+
+        colour: 'w' or 'b'
+        goal_ns: game time the goal was scored, e.g. when the button was
+                 pressed, now if None
+        """
+        if self.finished:
+            return None
+        if goal_ns is None:
+            goal_ns = self.clock.elapsed_ns()
+        self.add_points(colour, 1)
+        self.record("score", colour=colour, goal_ns=goal_ns)
+        if self.stage.name == "Golden Goal":
+            # If game was in golden goal, adding score will end the game
+            self.finished = True
+            self.record("end")
+        return None
+
+    def remove_score(self, colour: str) -> None:
+        """Take back a goal given by mistake.
+
+        colour: 'w' or 'b'
+        """
+        if self.finished:
+            return None
+        if (self.w_score if colour == "w" else self.b_score) > 0:
+            self.add_points(colour, -1)
+            self.record("correction", colour=colour)
+        return None
+
+    def add_penalty(self, colour: str, seconds: int) -> str | None:
+        """Send a player off for a time.
+
+        colour: 'w' or 'b'
+        Returns the penalty's key, e.g. 'w1', or None if the game is over
+        """
+        if self.finished:
+            return None
+        self.penalty_count += 1
+        key = f"{colour}{self.penalty_count}"
+        deadline_ns = self.served_from() + seconds*NS_PER_SEC
+        self.start_penalty(key, colour, deadline_ns)
+        self.record("penalty", key=key, colour=colour,
+                    deadline_ns=deadline_ns)
+        return key
+
+    def start_penalty(self, key: str, colour: str, deadline_ns: int) -> None:
+        """Start a penalty's timer without recording an event."""
+        self.penalties[key] = colour
+        self.penalty_count = max(self.penalty_count, int(key[1:]))
+        self.timers.add(key, deadline_ns, self.end_penalty)
+        return None
+
+    def end_penalty(self, key: str) -> None:
+        """Let a player back on, when their time is up or by mistake."""
+        if key in self.penalties:
+            del self.penalties[key]
+            self.timers.cancel(key)
+            self.record("penalty_end", key=key)
+        return None
+
+    def served_from(self) -> int:
+        """Return the clock time penalty time is being served from.
+
+        Now during play, or the end of the break during a break, as the
+        deadlines were pushed back to then.
+        """
+        if self.stage.name not in PLAYING and self.stage.end is not None:
+            return self.stage.end * NS_PER_SEC
+        return self.clock.elapsed_ns()
+
+    def penalty_times(self) -> list[tuple[str, int]]:
+        """Return (key, seconds left) of each penalty, soonest up first.
+
+        Seconds are rounded up, and don't count down over breaks.
+        """
+        now_ns = self.served_from()
+        times = [(self.timers.deadline(key), key) for key in self.penalties]
+        return [(key, max(-(-(deadline - now_ns) // NS_PER_SEC), 0))
+                for deadline, key in sorted(times)]
+
+    def start_timeout(self, kind: str) -> None:
+        """Stop the clock for a timeout, during play.
+
+        kind: 'Referee', 'White' or 'Black', see TIMEOUTS
+        """
+        if (self.finished or self.timeout is not None or
+                self.stage.name not in PLAYING):
+            return None
+        self.stop_clock(kind)
+        self.record("timeout", type=kind)
+        return None
+
+    def stop_clock(self, kind: str) -> None:
+        """Stop the clock for a timeout without recording an event, with a
+        timer to end it if it has a length.
+        """
+        self.clock.pause()
+        self.timeout = kind
+        if TIMEOUTS.get(kind) is not None:
+            self.pause_timers.add(
+                "timeout", self.clock.paused_at + TIMEOUTS[kind]*NS_PER_SEC,
+                lambda key: self.end_timeout())
+        return None
+
+    def end_timeout(self) -> None:
+        """Restart the clock from where the timeout stopped it."""
+        if self.timeout is None:
+            return None
+        self.pause_timers.cancel("timeout")
+        start = self.clock.elapsed()
+        length = round(self.clock.resume() / NS_PER_SEC, 1)
+        timeout = {"type": self.timeout, "stage": self.stage.name,
+                   "start": start, "length": length}
+        self.timeouts.append(timeout)
+        self.timeout = None
+        self.record("timeout_end", **timeout)
+        return None
+
+    def timeout_time(self) -> int:
+        """Return the seconds left of a timed timeout, or the seconds
+        taken of a referee timeout.
+        """
+        taken = self.clock.paused_for_ns()
+        if TIMEOUTS.get(self.timeout) is None:
+            return taken // NS_PER_SEC
+        return max(-(-(TIMEOUTS[self.timeout]*NS_PER_SEC - taken) //
+                     NS_PER_SEC), 0)
+
+    def add_points(self, colour: str, points: int) -> None:
+        """Change a team's score without recording an event."""
+        if colour == "w":
+            self.w_score += points
+        elif colour == "b":
+            self.b_score += points
+        return None
+
+    def snapshot(self) -> dict:
+        """Return what the displays show, for broadcasting."""
+        return {
+            "game": self.game,
+            "w_team": self.w_team,
+            "b_team": self.b_team,
+            "w_score": self.w_score,
+            "b_score": self.b_score,
+            "stage": self.stage.name,
+            "stage_type": self.stage.type,
+            "time_left": self.time_left,
+            "penalties": self.penalty_times(),
+            "timeout": self.timeout,
+            "finished": self.finished
+        }
+
+    def checkpoint(self) -> dict:
+        """Return everything needed to restore the game, as a snapshot."""
+        return {
+            "setup": {"time": self.time, "half": self.half,
+                      "overtime": self.overtime, "ot_time": self.ot_time,
+                      "ot_break": self.ot_break, "w_team": self.w_team,
+                      "b_team": self.b_team, "game": self.game},
+            "w_score": self.w_score,
+            "b_score": self.b_score,
+            "stage_index": self.stage_index,
+            "finished": self.finished,
+            "start_time": self.start_time.strftime("%H:%M:%S"),
+            "penalties": [[key, colour, self.timers.deadline(key)]
+                          for key, colour in self.penalties.items()],
+            "penalty_count": self.penalty_count,
+            "timeout": self.timeout,
+            "timeouts": self.timeouts
+        }
+
+    @classmethod
+    def restore(cls, checkpoint: dict, elapsed_ns: int,
+                time_source=time_module.monotonic_ns) -> "GameState":
+        """Create a game from a checkpoint, already running.
+
+        elapsed_ns: game time to carry on from
+        """
+        state = cls(**checkpoint["setup"], time_source=time_source)
+        state.w_score = checkpoint["w_score"]
+        state.b_score = checkpoint["b_score"]
+        state.apply("stage", {"index": checkpoint["stage_index"]})
+        state.finished = checkpoint["finished"]
+        for key, colour, deadline_ns in checkpoint.get("penalties", []):
+            state.start_penalty(key, colour, deadline_ns)
+        state.penalty_count = checkpoint.get("penalty_count", 0)
+        state.timeouts = list(checkpoint.get("timeouts", []))
+        state.start_time = datetime.strptime(checkpoint["start_time"],
+                                             "%H:%M:%S")
+        state.clock.start_ns = time_source() - elapsed_ns
+        if checkpoint.get("timeout") is not None:
+            # Carry on the timeout, from when the game was restored
+            state.apply("timeout", {"type": checkpoint["timeout"]})
+        return state
+
+    def result(self) -> dict:
+        """Return the result of the game to be saved."""
+        return {
+            "w_team": self.w_team,
+            "b_team": self.b_team,
+            "w_score": self.w_score,
+            "b_score": self.b_score,
+            "start_time": self.start_time.strftime("%H:%M:%S"),
+            # Time played, against the time since the start with timeouts
+            "playing_time": self.clock.elapsed(),
+            "elapsed_time": max(self.clock.real_ns() // NS_PER_SEC, 0),
+            "timeouts": self.timeouts
+        }
+
+
+if __name__ == "__main__":
+    # Simulate games faster than real time, and measure the tick cost
+    import random
+
+    class FakeTime:
+        """Time source that only moves when told to."""
+
+        def __init__(self) -> None:
+            self.ns = 0
+
+        def __call__(self) -> int:
+            return self.ns
+
+    games = 5000
+    ticks = 0
+    start = time_module.perf_counter()
+    for game in range(games):
+        fake = FakeTime()
+        state = GameState(10, 2, random.choice(["No Overtime", "Extra Time",
+                                                "Golden Goal"]),
+                          5, 1, game=game, time_source=fake)
+        state.start()
+        goals = sorted(random.randrange(0, 2400) for _ in range(4))
+        # Jump straight to each goal and stage end, not every second
+        times = sorted(set(goals + state.timeline.starts + [9999]))
+        for elapsed in times:
+            fake.ns = elapsed * 1_000_000_000
+            state.tick()
+            ticks += 1
+            if elapsed in goals:
+                state.add_score(random.choice("wb"))
+            if state.finished:
+                break
+    taken = time_module.perf_counter() - start
+    print(f"{games/taken:.0f} games/sec, {taken/ticks*1e6:.2f} us/tick")
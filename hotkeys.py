@@ -0,0 +1,166 @@
+"""Keyboard control of an underwater hockey game, e.g. from foot pedals.
+
+v1 - One table of keys to actions, with debounce and auto-repeat ignored
+"""
+
+import tkinter as tk
+from event_clock import EventClock
+from tick_profiler import RingBuffer
+
+# Action of each key, by keysym. Foot pedals and presentation clickers
+# are keyboards that send Page Up/Down (Prior/Next)
+DEFAULT_KEYS = {
+    "w": "white_goal", "Prior": "white_goal",
+    "b": "black_goal", "Next": "black_goal",
+    "u": "undo", "BackSpace": "undo",
+    "p": "pause",
+    "1": "white_timeout", "2": "black_timeout",
+}
+DEBOUNCE_MS = 150  # Presses of the same action closer than this are one
+# X sends a held key as release and press pairs this close together
+REPEAT_MS = 2
+
+
+class Hotkeys:
+    """Runs game actions from key presses.
+
+    Every key goes through one dispatch table of keysym to action, so a
+    press is a dict lookup and a call. A held key's auto-repeats are
+    ignored, as are a pedal's bounces, so each press is one action. The
+    time from each press to its action finishing is kept.
+    """
+
+    def __init__(self, actions: dict, keys: dict | None = None,
+                 events: EventClock | None = None,
+                 debounce_ms: int = DEBOUNCE_MS) -> None:
+        """Create hotkeys.
+
+        actions: function of each action name, called with the monotonic
+                 time the key was pressed
+        keys: action name of each keysym, DEFAULT_KEYS if None
+        events: maps event.time onto the monotonic time base
+        """
+        self.keys = dict(DEFAULT_KEYS if keys is None else keys)
+        self.actions = actions
+        self.events = EventClock() if events is None else events
+        self.debounce_ms = debounce_ms
+        self.held = set()  # Keysyms down, to ignore their auto-repeats
+        # event.time each keysym was last let go, as X sends a held key's
+        # auto-repeats as a release then a press at the same time
+        self.released = {}
+        self.last_ms = {}  # event.time each action last ran
+        self.latency = RingBuffer()  # Press until the action finished, ns
+        self.widget = None  # Widget the keys are bound on, if any
+
+    def bind(self, widget: tk.Misc) -> None:
+        """Listen for keys in every window of the widget's application."""
+        self.widget = widget
+        widget.bind_all("<KeyPress>", self.press)
+        widget.bind_all("<KeyRelease>", self.release)
+        widget.bind_all("<FocusOut>", self.focus_out)
+        return None
+
+    def unbind(self) -> None:
+        """Stop listening for keys."""
+        if self.widget is not None:
+            self.widget.unbind_all("<KeyPress>")
+            self.widget.unbind_all("<KeyRelease>")
+            self.widget.unbind_all("<FocusOut>")
+            self.widget = None
+        return None
+
+    def press(self, event: tk.Event) -> None:
+        """Run the action of a pressed key, once per press."""
+        keysym = event.keysym
+        action = self.keys.get(keysym) or self.keys.get(keysym.lower())
+        if action is None or action not in self.actions:
+            return None
+        released = self.released.pop(keysym, None)
+        if keysym in self.held or (released is not None and
+                                   0 <= event.time - released <= REPEAT_MS):
+            # Auto-repeat of a key still held down, Windows repeats the
+            # press alone, X repeats the release too
+            self.held.add(keysym)
+            return None
+        self.held.add(keysym)
+        last = self.last_ms.get(action)
+        if last is not None and 0 <= event.time - last < self.debounce_ms:
+            # Pedal contacts bouncing, or pressed twice by mistake
+            return None
+        self.last_ms[action] = event.time
+
+        pressed_ns = self.events.to_monotonic(event.time)
+        self.actions[action](pressed_ns)
+        self.latency.add(self.events.time_source() - pressed_ns)
+        return None
+
+    def release(self, event: tk.Event) -> None:
+        """Note when a key was let go, it may just be auto-repeating."""
+        self.held.discard(event.keysym)
+        self.released[event.keysym] = event.time
+        return None
+
+    def focus_out(self, event: tk.Event) -> None:
+        """Forget the keys held down, their releases go to another app."""
+        self.held.clear()
+        return None
+
+    def summary(self) -> dict:
+        """Return the percentiles of the key-to-action latency in ms."""
+        return {
+            "presses": self.latency.count,
+            "latency_ms": {p: ns / 1e6 for p, ns in
+                           self.latency.percentiles().items()}
+        }
+
+
+if __name__ == "__main__":
+    # Time key presses until the game state has changed, and check held
+    # keys and pedal bounces only count once, without Tk
+    import random
+    import time
+    from types import SimpleNamespace
+    from game_state import GameState
+
+    state = GameState(10, 2)
+    state.start()
+    actions = {
+        "white_goal": lambda ns: state.add_score(
+            "w", state.clock.elapsed_at_ns(ns)),
+        "black_goal": lambda ns: state.add_score(
+            "b", state.clock.elapsed_at_ns(ns)),
+        "undo": lambda ns: state.remove_score("w"),
+        "pause": lambda ns: (state.end_timeout() if state.timeout
+                             else state.start_timeout("Referee")),
+    }
+    hotkeys = Hotkeys(actions)
+
+    def event(keysym: str, offset_ms: int = 0) -> SimpleNamespace:
+        """Return a key event happening now."""
+        return SimpleNamespace(keysym=keysym, time=(time.monotonic_ns() //
+                                                    1_000_000) + offset_ms)
+
+    # A pedal held down for 20 auto-repeats is one goal
+    hotkeys.press(event("Prior"))
+    for i in range(20):
+        hotkeys.release(event("Prior"))
+        hotkeys.press(event("Prior"))
+    hotkeys.release(event("Prior"))
+    # A bounce 30 ms after a press is ignored
+    hotkeys.press(event("Next", -DEBOUNCE_MS))
+    hotkeys.release(event("Next", -DEBOUNCE_MS))
+    hotkeys.press(event("Next", 30 - DEBOUNCE_MS))
+    hotkeys.release(event("Next", 40 - DEBOUNCE_MS))
+    print(f"Held and bounced presses: {state.w_score}-{state.b_score}")
+    # Presses whose releases went to another window each count, as the
+    # window lost focus
+    for i in range(3):
+        hotkeys.press(event("Next", (i + 1) * DEBOUNCE_MS))
+        hotkeys.focus_out(None)
+    print(f"Presses with lost releases: {state.w_score}-{state.b_score}")
+
+    for i in range(10000):
+        keysym = random.choice(("w", "b", "u", "p"))
+        hotkeys.press(event(keysym, i * DEBOUNCE_MS))
+        hotkeys.release(event(keysym, i * DEBOUNCE_MS))
+    print(hotkeys.summary())
@@ -4,6 +4,27 @@ v1 - Runs the game with 2 halves and 1 half-time, with scoring
 v2 - Saves the results of the game at the end
 v2.1 - Adds confirmation message for goals during half-time
 v3 - Overhauled time logic, added overtime procedures for ties
+v3.1 - Uses a monotonic game clock, catches up on missed stage ends
+v3.2 - Looks up the stage from a precomputed timeline, times in minutes
+v4 - Game logic moved to GameState, this frame is a view over it
+v4.1 - Results and goals are appended to a journal
+v4.2 - Results can be saved to a SQLite database instead
+v4.3 - Saves on a writer thread so the window never freezes
+v4.4 - Only reconfigures the styles that change with the stage
+v4.5 - Uses the shared style, with its own background style
+v4.6 - Publishes the game state to remote displays
+v4.7 - Can be run by a CourtController alongside other games
+v4.8 - Adds saved results to the tournament standings
+v4.9 - Logs every event, and can carry on a game rebuilt from its log
+v4.10 - Keeps a memory-mapped checkpoint of the game to resume from
+v4.11 - Ticks can be profiled, dumped with F12 or at the end of the game
+v4.12 - Labels are only set when their text changes, once per update
+v4.13 - Shows tenths in the final minute and golden goal, ticking at 10 Hz
+v4.14 - Timed penalties for any number of players
+v4.15 - Referee and team timeouts stop the clock until resumed
+v4.16 - Questions and errors are shown in the window, without blocking it
+v4.17 - Goals are timed from the button press, with press-to-display latency
+v4.18 - Goals, undo and timeouts can be given from the keyboard or pedals
 
 Created by Luke Marshall
 21/08/25
@@ -11,12 +32,22 @@ Created by Luke Marshall
 
 import tkinter as tk
 from tkinter import ttk
-from tkinter import messagebox
 from datetime import datetime
-from datetime import timedelta
-import json
-from custom_style import CustomStyle
+from custom_style import get_style
+from game_clock import NS_PER_SEC, NS_PER_TENTH
+from game_state import GameState
 from output import OutputFrame
+from save_worker import SaveWorker
+from event_log import EventLog, log_path
+from live_checkpoint import LiveCheckpoint
+from view_model import ViewModel
+from prompt_bar import PromptBar
+from event_clock import EventClock
+from hotkeys import Hotkeys
+
+CONFIRM_TIMEOUT_MS = 10000  # Unanswered goal confirmations aren't added
+# Penalty lengths that can be given, in seconds by label
+PENALTY_LENGTHS = {"1 min": 60, "2 min": 120, "5 min": 300}
 
 
 class InputFrame(ttk.Frame):
@@ -30,11 +61,15 @@ class InputFrame(ttk.Frame):
                  half: int = 2, overtime: str = "No Overtime",
                  ot_time: int = 0, ot_break: int = 0,
                  w_team: str = "WHITE TEAM", b_team: str = "BLACK TEAM",
-                 game: int = 1) -> None:
+                 game: int = 1, broadcast=None, saver=None, standings=None,
+                 namespace: str = "input", scheduled: bool = True,
+                 state: GameState | None = None,
+                 checkpoint_fp: str = "live_game.ckpt",
+                 profiler=None, keys: dict | None = None) -> None:
         """Create input frame.
 
         master: tkinter window or frame to place input frame in
-        save_fp: json file path to save game results to
+        save_fp: json or sqlite .db file path to save game results to
         time: length of each half of the game
         half: length of half-time
         overtime: "No Overtime", "Extra Time" or "Golden Goal"
@@ -43,23 +78,38 @@ class InputFrame(ttk.Frame):
         w_team: abbreviated white team name
         b_team: abbreviated black team name
         game: game number (doesn't matter in this context but useful later)
+        broadcast: BroadcastServer to publish the game state to, if any
+        saver: SaveWorker shared with other games, one is made if None
+        standings: Standings the result is added to once saved, if any
+        namespace: style namespace for this window's background colour
+        scheduled: False if update() is called by something else,
+                   e.g. a CourtController running several games
+        state: game to carry on, e.g. rebuilt after a crash, instead of
+               starting a new one from the arguments above
+        checkpoint_fp: file the live state is kept in, to resume from
+        profiler: TickProfiler to time each tick of this frame's clock
+        keys: action of each keysym, hotkeys.DEFAULT_KEYS if None, or {}
+              for none, e.g. when several games share the keyboard
         """
         super().__init__(master)  # Inherit methods from ttk.Frame
 
-        self.save_fp = save_fp  # Json file path to save the game results to
-        self.time = time  # Length of each half of the game
-        self.half = half  # Length of half-time
-        self.overtime = overtime  # Overtime procedure when game ends in a tie
-        self.ot_time = ot_time  # Length of each half of overtime
-        self.ot_break = ot_break  # Time between overtime halves
-        self.w_team = w_team
-        self.b_team = b_team
-        self.game = game  # Game number
-        self.start_time = datetime.now()
-        self.time_to_remove = 0
-        self.time_to_get_to = self.time
-
-        self.style = CustomStyle(self)
+        self.save_fp = save_fp  # File path to save the game results to
+        self.own_saver = saver is None  # Only close the saver if made here
+        self.saver = SaveWorker(self, save_fp) if saver is None else saver
+
+        # Scores, stage and clock, this frame only displays and controls it
+        self.resumed = state is not None
+        if state is None:
+            state = GameState(time, half, overtime, ot_time, ot_break,
+                              w_team, b_team, game)
+        self.state = state
+        self.broadcast = broadcast
+        self.standings = standings
+
+        self.style = get_style(self)
+        self.namespace = namespace
+        self.configure(style=self.style.add_namespace(namespace))
+        self.namespaces = [namespace]  # Windows that show the stage colour
         self.rowconfigure(list(range(3)), weight=1)
         self.columnconfigure(list(range(3)), weight=1)
         self.pad = 5  # Padding between widgets
@@ -77,7 +127,7 @@ class InputFrame(ttk.Frame):
                                        style="med.box.TLabel")
         self.box_grid(self.time_left_lbl, 0, 0, "xy")
 
-        self.stage_var = tk.StringVar(self, "First Half")
+        self.stage_var = tk.StringVar(self, self.state.stage.name)
         self.stage_lbl = ttk.Label(self.time_frm, textvariable=self.stage_var,
                                    style="box.TLabel")
         self.box_grid(self.stage_lbl, 1, 0, "x")
@@ -98,11 +148,11 @@ class InputFrame(ttk.Frame):
                                    style="med.white.box.TLabel")
         self.box_grid(self.white_lbl, 0, 0, "xy")
 
-        self.w_team_lbl = ttk.Label(self.white_frm, text=self.w_team,
+        self.w_team_lbl = ttk.Label(self.white_frm, text=self.state.w_team,
                                     style="white.box.TLabel")
         self.box_grid(self.w_team_lbl, 1, 0, "x")
 
-        self.w_score = tk.IntVar(self, 0)
+        self.w_score = tk.IntVar(self, self.state.w_score)
         self.w_score_lbl = ttk.Label(self.white_frm, textvariable=self.w_score,
                                      style="lrg.white.box.TLabel")
         self.box_grid(self.w_score_lbl, 2, 0, "xy")
@@ -118,21 +168,28 @@ class InputFrame(ttk.Frame):
                                    style="med.black.box.TLabel")
         self.box_grid(self.black_lbl, 0, 0, "xy")
 
-        self.b_team_lbl = ttk.Label(self.black_frm, text=self.b_team,
+        self.b_team_lbl = ttk.Label(self.black_frm, text=self.state.b_team,
                                     style="black.box.TLabel")
         self.box_grid(self.b_team_lbl, 1, 0, "x")
 
-        self.b_score = tk.IntVar(self, 0)
+        self.b_score = tk.IntVar(self, self.state.b_score)
         self.b_score_lbl = ttk.Label(self.black_frm, textvariable=self.b_score,
                                      style="lrg.box.TLabel")
         self.box_grid(self.b_score_lbl, 2, 0, "xy")
 
+        # Times goals from when their button was pressed, not released
+        self.events = EventClock(self.state.clock.time_source)
+        self.pressed_ns = None  # Time the last goal button was pressed
+        # (colour, stage, seconds) of each goal given here, to undo
+        self.goals = []
+
         # Button to add score to the white team
         self.white_btn = ttk.Button(self, text="White Score +1",
                                     command=lambda: self.add_score("w"),
                                     style="white.TButton")
         self.frame_grid(self.white_btn, 1, 0)
         self.white_btn.grid_configure(ipadx=self.ipad, ipady=self.ipad)
+        self.white_btn.bind("<ButtonPress-1>", self.press)
 
         # Button to add score to the black team
         self.black_btn = ttk.Button(self, text="Black Score +1",
@@ -140,6 +197,57 @@ class InputFrame(ttk.Frame):
                                     style="black.TButton")
         self.frame_grid(self.black_btn, 1, 2)
         self.black_btn.grid_configure(ipadx=self.ipad, ipady=self.ipad)
+        self.black_btn.bind("<ButtonPress-1>", self.press)
+
+        # Gives timed penalties, and lets a player back on by mistake
+        self.pen_frm = ttk.Frame(self, style=f"{namespace}.TFrame")
+        self.pen_frm.columnconfigure(list(range(2)), weight=1)
+        self.frame_grid(self.pen_frm, 1, 1)
+        self.pen_length = tk.StringVar(self, "2 min")
+        self.pen_box = ttk.Combobox(self.pen_frm, state="readonly",
+                                    textvariable=self.pen_length,
+                                    values=list(PENALTY_LENGTHS),
+                                    width=6)
+        self.pen_box.grid(row=0, column=0, columnspan=2, sticky="WE")
+        self.w_pen_btn = ttk.Button(self.pen_frm, text="White Penalty",
+                                    command=lambda: self.add_penalty("w"),
+                                    style="white.TButton")
+        self.w_pen_btn.grid(row=1, column=0, sticky="NSWE")
+        self.b_pen_btn = ttk.Button(self.pen_frm, text="Black Penalty",
+                                    command=lambda: self.add_penalty("b"),
+                                    style="black.TButton")
+        self.b_pen_btn.grid(row=1, column=1, sticky="NSWE")
+        self.release_btn = ttk.Button(self.pen_frm, text="Release Last",
+                                      command=self.release_penalty,
+                                      style=f"{namespace}.TButton")
+        self.release_btn.grid(row=2, column=0, columnspan=2, sticky="WE")
+        # Stops the clock for a timeout, until resumed or the team's is up
+        self.w_timeout_btn = ttk.Button(
+            self.pen_frm, text="White Timeout", style="white.TButton",
+            command=lambda: self.start_timeout("White"))
+        self.w_timeout_btn.grid(row=3, column=0, sticky="NSWE")
+        self.b_timeout_btn = ttk.Button(
+            self.pen_frm, text="Black Timeout", style="black.TButton",
+            command=lambda: self.start_timeout("Black"))
+        self.b_timeout_btn.grid(row=3, column=1, sticky="NSWE")
+        self.ref_timeout_btn = ttk.Button(
+            self.pen_frm, text="Ref Timeout", style=f"{namespace}.TButton",
+            command=lambda: self.start_timeout("Referee"))
+        self.ref_timeout_btn.grid(row=4, column=0, sticky="NSWE")
+        self.resume_btn = ttk.Button(self.pen_frm, text="Resume",
+                                     command=self.end_timeout,
+                                     style=f"{namespace}.TButton")
+        self.resume_btn.grid(row=4, column=1, sticky="NSWE")
+
+        # Displays the penalties being served and their time left
+        self.pens_frm = ttk.Frame(self, style="box.TFrame")
+        self.pens_frm.rowconfigure(0, weight=1)
+        self.pens_frm.columnconfigure(0, weight=1)
+        self.frame_grid(self.pens_frm, 2, 1)
+        self.pens_var = tk.StringVar(self, "No penalties")
+        self.pens_lbl = ttk.Label(self.pens_frm, textvariable=self.pens_var,
+                                  style="box.TLabel")
+        self.box_grid(self.pens_lbl, 0, 0, "xy")
 
         # Displays the actual time of day
         self.real_frm = ttk.Frame(self, style="box.TFrame")
@@ -158,125 +266,200 @@ class InputFrame(ttk.Frame):
         self.num_frm.rowconfigure(0, weight=1)
         self.num_frm.columnconfigure(0, weight=1)
         self.frame_grid(self.num_frm, 2, 2)
-        self.num_var = tk.StringVar(self, f"Game no. {self.game}")
+        self.num_var = tk.StringVar(self, f"Game no. {self.state.game}")
         self.num_lbl = ttk.Label(self.num_frm, textvariable=self.num_var,
                                  style="box.TLabel")
         self.box_grid(self.num_lbl, 0, 0, "xy")
 
-        # Updates the time labels every second
-        self.update()
-
-    def update(self) -> None:
-        """Updates the time of the window."""
+        # Asks questions and shows errors, only while there are any
+        self.prompt = PromptBar(self, row=3, column=0, columnspan=3,
+                                sticky="NSWE", padx=self.pad, pady=self.pad)
+
+        # Every label that changes during the game, in this and the outputs
+        self.view = ViewModel({"stage": self.stage_var,
+                               "time": self.time_var,
+                               "w_score": self.w_score,
+                               "b_score": self.b_score,
+                               "real": self.real_var,
+                               "penalties": self.pens_var})
+
+        # Updates the time labels on every whole second of the game
+        self.clock = self.state.clock
+        if scheduled:
+            self.clock.master = self
+        self.profiler = profiler
+        if profiler is not None:
+            # Count the Tcl calls made through everything a tick updates
+            self.clock.profiler = profiler
+            profiler.instrument(self, self.style, self.real_var,
+                                self.time_var, self.stage_var, self.w_score,
+                                self.b_score)
+            self.master.bind("<F12>", lambda event: (profiler.dump(),
+                                                     self.events.dump()))
+        # Every key press goes through one table of actions
+        self.hotkeys = Hotkeys({
+            "white_goal": lambda pressed_ns: self.add_score("w", pressed_ns),
+            "black_goal": lambda pressed_ns: self.add_score("b", pressed_ns),
+            "undo": lambda pressed_ns: self.undo_goal(),
+            "pause": lambda pressed_ns: (
+                self.end_timeout() if self.state.timeout is not None
+                else self.start_timeout("Referee")),
+            "white_timeout": lambda pressed_ns: self.start_timeout("White"),
+            "black_timeout": lambda pressed_ns: self.start_timeout("Black"),
+        }, keys, self.events)
+        if self.hotkeys.keys:
+            self.hotkeys.bind(self)
+        if self.resumed:
+            # Carry on the clock from where the game was rebuilt to
+            self.change_stage(self.state.stage.name, self.state.stage.type)
+            if self.state.timeout is not None:
+                self.change_stage(self.timeout_text(), "Timeout")
+            self.view.flush()
+            self.clock.start(self.clock.start_ns)
+        else:
+            self.state.start()
+        # Every goal and stage change is logged, to rebuild after a crash
+        self.log = EventLog(self.state, log_path(self.state.game),
+                            self.resumed)
+        self.live = LiveCheckpoint(self.state, checkpoint_fp)
+        if scheduled:
+            # Only now update() has a log and checkpoint to write to, as
+            # the clock's first tick ran when it started
+            self.clock.callback = self.update
+            self.update()
+
+    def update(self, elapsed: int | None = None) -> None:
+        """Updates the time of the window.
+
+        elapsed: whole seconds since the game started, from the game clock
+        """
         self.now = datetime.now()
-        self.real_var.set(self.now.strftime("%H:%M:%S"))
-
-        # Calc difference between now and start, remove microsecond accuracy
-        diff = self.now - self.start_time
-        diff -= timedelta(microseconds=diff.microseconds)
-        seconds = diff.seconds - self.time_to_remove
-        # time_to_remove is the sum of halves/breaks already passed
-
-        if self.stage_var.get() == "Golden Goal":
-            # In golden goal, time counts upward from 0:00
-            self.change_time(seconds)
-
-        elif seconds < self.time_to_get_to:
-            # Set time to difference between end of half/break and now
-            # Counts down
-            self.change_time(self.time_to_get_to-seconds)
-
-        elif seconds == self.time_to_get_to:
-            # When the end of a break/half is reached, change the stage
-            match self.stage_var.get():
-                case "First Half":
-                    self.change_stage("Half-Time", "Break")
-                    self.time_to_remove += self.time
-                    self.time_to_get_to = self.half
-                case "Half-Time":
-                    self.change_stage("Second Half", "Normal")
-                    self.time_to_remove += self.half
-                    self.time_to_get_to = self.time
-                case "Second Half":
-                    if (self.w_score.get() != self.b_score.get() or
-                            self.overtime == "No Overtime"):
-                        # If game is not tied, or overtime is not needed
-                        self.save()
-                        # Inform user game has ended and ask to close
-                        if messagebox.askyesno("Game over",
-                                               "Game over. Close window?"):
-                            self.master.destroy()
-
-                    # Otherwise overtime procedures are used
-                    elif self.overtime == "Golden Goal":
-                        self.change_stage("Golden Goal", "Timeout")
-                        self.time_to_remove += self.time
-                        self.time_to_get_to = 0
-                    elif self.overtime == "Extra Time":
-                        self.change_stage("Extra Time Break", "Timeout")
-                        self.time_to_remove += self.time
-                        self.time_to_get_to = self.ot_break
-                case "Extra Time Break":
-                    self.change_stage("Extra Time 1st Half", "Timeout")
-                    self.time_to_remove += self.ot_break
-                    self.time_to_get_to = self.ot_time
-                case "Extra Time 1st Half":
-                    self.change_stage("Extra Half-Time", "Timeout")
-                    self.time_to_remove += self.ot_time
-                    self.time_to_get_to = self.ot_break
-                case "Extra Half-Time":
-                    self.change_stage("Extra Time 2nd Half", "Timeout")
-                    self.time_to_remove += self.ot_break
-                    self.time_to_get_to = self.ot_time
-                case "Extra Time 2nd Half":
-                    if self.w_score.get() != self.b_score.get():
-                        # If game is not tied
-                        self.save()
-                        # Inform user game has ended and ask to close
-                        if messagebox.askyesno("Game over",
-                                               "Game over. Close window?"):
-                            self.master.destroy()
-                    else:
-                        # If still a tie, go into golden goal
-                        self.change_stage("Golden Goal", "Timeout")
-                        self.time_to_remove += self.ot_time
-                        self.time_to_get_to = 0
-            seconds = diff.seconds - self.time_to_remove
-            self.change_time(self.time_to_get_to-seconds)
-
-        # Runs update() again in 1 second
-        self.update_command = self.after(1000, self.update)
+        self.view.set("real", self.now.strftime("%H:%M:%S"))
+
+        timeout = self.state.timeout
+        if self.state.tick(elapsed) or self.state.timeout != timeout:
+            # New stage, or a team's timeout is up
+            self.change_stage(self.state.stage.name, self.state.stage.type)
+        if self.state.timeout is not None:
+            self.view.set("stage", self.timeout_text())
+        tenths = self.state.tenths()
+        self.change_time(self.state.time_left, tenths)
+        self.change_penalties()
+        # Only wake up 10 times a second while tenths are shown
+        self.clock.interval_ns = NS_PER_SEC if tenths is None else NS_PER_TENTH
+        self.view.flush()
+        self.live.write()
+        self.publish()
+        if self.state.finished:
+            self.end_game("Game over. Close window?")
+        return None
+
+    def publish(self) -> None:
+        """Send the game state to any remote displays."""
+        if self.broadcast is not None:
+            self.broadcast.publish(self.state.snapshot())
+        return None
+
+    def end_game(self, message: str) -> None:
+        """Save the results, then inform user and ask to close."""
+        self.save()
+        if self.profiler is not None:
+            self.profiler.dump("tick_profile.jsonl")
+            self.events.dump("tick_profile.jsonl")
+        self.prompt.ask("Game over", message, self.close_window)
+        return None
+
+    def close_window(self, close: bool) -> None:
+        """Close the window if the user said to at the end of the game."""
+        if close:
+            self.master.destroy()
+        return None
+
+    def change_time(self, seconds: int, tenths: int | None = None) -> None:
+        """Change the time label.
+
+        tenths: time in tenths of a second, shown instead if not None
+        """
+        if tenths is None:
+            minutes, seconds = divmod(seconds, 60)
+            self.view.set("time", f"{minutes:02}:{seconds:02}")
+        elif self.state.stage.end is None:
+            # Golden goal counts up, maybe for longer than a minute
+            seconds, tenth = divmod(tenths, 10)
+            minutes, seconds = divmod(seconds, 60)
+            self.view.set("time", f"{minutes:02}:{seconds:02}.{tenth}")
+        else:
+            seconds, tenth = divmod(tenths, 10)
+            self.view.set("time", f"{seconds:02}.{tenth}")
+        return None
+
+    def change_penalties(self) -> None:
+        """Change the penalties label."""
+        times = [f"{key.upper()} {seconds//60}:{seconds%60:02}"
+                 for key, seconds in self.state.penalty_times()]
+        self.view.set("penalties", "  ".join(times) or "No penalties")
         return None
 
-    def change_time(self, seconds: int) -> None:
-        """Change the time label."""
-        minutes, seconds = divmod(seconds, 60)
-        self.time_var.set(f"{minutes:02}:{seconds:02}")
+    def add_penalty(self, colour: str) -> None:
+        """Send a player off for the chosen length.
+
+        colour: 'w' or 'b'
+        """
+        self.state.add_penalty(colour, PENALTY_LENGTHS[self.pen_length.get()])
+        self.change_penalties()
+        self.view.flush()
+        self.publish()
         return None
 
+    def release_penalty(self) -> None:
+        """Let back on the player given the latest penalty still running."""
+        if self.state.penalties:
+            self.state.end_penalty(max(self.state.penalties,
+                                       key=lambda key: int(key[1:])))
+            self.change_penalties()
+            self.view.flush()
+        return None
+
+    def start_timeout(self, kind: str) -> None:
+        """Stop the clock for a timeout, showing it in red.
+
+        kind: 'Referee', 'White' or 'Black'
+        """
+        self.state.start_timeout(kind)
+        if self.state.timeout is not None:
+            self.change_stage(self.timeout_text(), "Timeout")
+            self.view.flush()
+            self.publish()
+        return None
+
+    def end_timeout(self) -> None:
+        """Restart the clock, back to the stage the timeout was in."""
+        if self.state.timeout is not None:
+            self.state.end_timeout()
+            self.change_stage(self.state.stage.name, self.state.stage.type)
+            self.view.flush()
+            self.publish()
+        return None
+
+    def timeout_text(self) -> str:
+        """Return the stage label of the timeout being taken, with the
+        time left of a team's timeout or taken of a referee's.
+        """
+        minutes, seconds = divmod(self.state.timeout_time(), 60)
+        return f"{self.state.timeout} Timeout {minutes}:{seconds:02}"
+
     def change_stage(self, stage: str, stage_type: str) -> None:
         """Change the stage label and background colour.
 
         stage_type: 'Normal', 'Break' or 'Timeout'
         """
-        if stage_type == "Timeout":
-            # Change background colour to red, and store actual stage
-            self.style.bg = "#ff0000"
-            self.style.config()
-            self.actual_stage = self.stage_var.get()
-            # Actual stage will be used by ref/team timeouts
-
-        elif stage_type == "Break":
-            # Change background colour to yellow
-            self.style.bg = "#ffff00"
-            self.style.config()
-        else:
-            # Change background colour to normal
-            self.style.bg = "#dddddd"
-            self.style.config()
+        # Change background colour, red for timeouts, yellow for breaks
+        # Only this window and the outputs showing it are reconfigured
+        for namespace in self.namespaces:
+            self.style.set_stage(stage_type, namespace)
 
         # Change label
-        self.stage_var.set(stage)
+        self.view.set("stage", stage)
         return None
 
     def frame_grid(self, widget: ttk.Frame, row: int, column: int) -> None:
@@ -299,91 +482,158 @@ class InputFrame(ttk.Frame):
             widget.grid_configure(pady=self.bd)
         return None
 
-    def add_score(self, colour: str) -> None:
+    def press(self, event: tk.Event) -> None:
+        """Keep when a goal button was pressed, for when it's released."""
+        self.pressed_ns = self.events.to_monotonic(event.time)
+        return None
+
+    def add_score(self, colour: str, pressed_ns: int | None = None) -> None:
         """Add score to one of the teams.
 
         colour: 'w' or 'b'
+        pressed_ns: monotonic time the goal was given, the last goal
+                    button press if None
         """
-        add = True  # Will be set to false if user has made a mistake
-        if (self.stage_var.get() == "Half-Time" or
-                self.stage_var.get() == "Extra Half-Time" or
-                self.stage_var.get() == "Extra Time Break"):
-            m = "It is half-time. Add score anyway?"
-            add = messagebox.askyesno("Add Score", m)
-        elif self.stage_var.get() == "Timeout":
-            m = "Game is on a timeout. Add score anyway?"
-            add = messagebox.askyesno("Add Score", m)
-
-        if add:
-            if colour == "w":
-                self.w_score.set(self.w_score.get()+1)
-            elif colour == "b":
-                self.b_score.set(self.b_score.get()+1)
-        if self.stage_var.get() == "Golden Goal":
+        if pressed_ns is None:
+            pressed_ns = self.pressed_ns
+        pressed_ns = self.events.press_time(pressed_ns)
+        self.pressed_ns = None
+        # Game time of the press now, as a timeout started before the goal
+        # is confirmed would change it
+        goal_ns = max(self.clock.elapsed_at_ns(pressed_ns), 0)
+        m = self.state.confirm_message()
+        if m is not None:
+            # Likely a mistake, so only added if the user says so
+            self.prompt.ask("Add Score", m,
+                            lambda add: add and self.confirm_score(
+                                colour, goal_ns, pressed_ns),
+                            CONFIRM_TIMEOUT_MS)
+        else:
+            self.score(colour, goal_ns)
+            # Labels are redrawn when idle, before this runs
+            self.after_idle(self.events.displayed, pressed_ns)
+        return None
+
+    def confirm_score(self, colour: str, goal_ns: int,
+                      pressed_ns: int) -> None:
+        """Add a goal the user said to add anyway, see add_score()."""
+        self.score(colour, goal_ns)
+        self.after_idle(self.events.displayed, pressed_ns, True)
+        return None
+
+    def score(self, colour: str, goal_ns: int) -> None:
+        """Add a goal, and end the game if it was a golden goal.
+
+        colour: 'w' or 'b'
+        goal_ns: game time the goal was given
+        """
+        if self.state.finished:
+            # Already ended, e.g. answered after the game ran out of time
+            return None
+        self.state.add_score(colour, goal_ns)
+        seconds = goal_ns // NS_PER_SEC
+        goal = (colour, self.state.stage_at(seconds), seconds)
+        self.goals.append(goal)
+        self.saver.submit("add_goal", self.state.game, *goal)
+        self.view.set("w_score", self.state.w_score)
+        self.view.set("b_score", self.state.b_score)
+        self.view.flush()
+        self.publish()
+        if self.state.finished:
             # If game was in golden goal, adding score will end the game
-            self.save()
-            if messagebox.askyesno("Game over",
-                                   "Game has ended. Close window?"):
-                self.master.destroy()
+            self.end_game("Game has ended. Close window?")
+        return None
+
+    def undo_goal(self) -> None:
+        """Take back the last goal given, e.g. pressed by mistake."""
+        if self.goals and not self.state.finished:
+            goal = self.goals.pop()
+            self.state.remove_score(goal[0])
+            # So the saved goals still add up to the saved score
+            self.saver.submit("remove_goal", self.state.game, *goal)
+            self.view.set("w_score", self.state.w_score)
+            self.view.set("b_score", self.state.b_score)
+            self.view.flush()
+            self.publish()
         return None
 
     def save(self) -> None:
-        """Save the game scores to a json file."""
-        self.after_cancel(self.update_command)  # Stops time from updating
-        try:
-            # Open json file to read
-            with open(self.save_fp, "r") as f:
-                results = json.load(f)
-        except FileNotFoundError:
-            # Create json file if not found
-            with open(self.save_fp, "x") as f:
-                results = {"save_error": []}
-        except json.decoder.JSONDecodeError:
-            # Create empty dict if json file is empty
-            results = {"save_error": []}
-
-        if str(self.game) in results.keys():
-            # Add game results to save_error list in dictionary
-            m = f"Could not save, results for game no. {self.game} already exists"
-            messagebox.showerror("Save Error", m)
-            results["save_error"].append({
-                "w_team": self.w_team,
-                "b_team": self.b_team,
-                "w_score": self.w_score.get(),
-                "b_score": self.b_score.get(),
-                "start_time": self.start_time.strftime("%H:%M:%S")
-            })
-        else:
-            # Otherwise add result to dictionary as normal
-            results[self.game] = {
-                "w_team": self.w_team,
-                "b_team": self.b_team,
-                "w_score": self.w_score.get(),
-                "b_score": self.b_score.get(),
-                "start_time": self.start_time.strftime("%H:%M:%S")
-            }
-
-        # Save dictionary to the json file
-        with open(self.save_fp, "w") as f:
-            json.dump(results, f, indent=4)
+        """Save the game scores on the writer thread."""
+        self.clock.stop()  # Stops time from updating
+        self.saver.submit("add_result", self.state.game, self.state.result(),
+                          on_done=self.saved, on_error=self.save_failed)
         return None
 
+    def saved(self, added: bool) -> None:
+        """Update the standings, or tell the user if the result clashed."""
+        if added and self.standings is not None:
+            self.standings.add_result(self.state.result())
+            if self.broadcast is not None:
+                self.broadcast.publish(
+                    {"standings": self.standings.rows_for_broadcast()})
+        if not added:
+            # Result was added to save_error list instead
+            game = self.state.game
+            m = f"Could not save, results for game no. {game} already exists"
+            self.prompt.notify("Save Error", m)
+        return None
 
-if __name__ == "__main__":
+    def save_failed(self, error: Exception) -> None:
+        """Tell the user the result couldn't be written."""
+        self.prompt.notify("Save Error", f"Could not save results: {error}")
+        return None
+
+    def destroy(self) -> None:
+        """Finish writing any saves, then destroy the frame."""
+        self.hotkeys.unbind()
+        # An unfinished game's log is kept, so it can be resumed
+        self.log.close()
+        self.live.close()
+        if self.own_saver:
+            self.saver.close()
+        super().destroy()
+        return None
+
+
+def check() -> None:
+    """Build a scheduled InputFrame and run one tick of its clock, as the
+    app does when a game starts. Needs a display.
+    """
+    import os
+    import tempfile
+
+    os.chdir(tempfile.mkdtemp())  # Keep the game's logs out of the way
     root = tk.Tk()
-    root.title("Input")
-    root.rowconfigure(0, weight=1)
-    root.columnconfigure(0, weight=1)
-
-    frame = InputFrame(root, "results.json", 10, 2)
-    frame.grid(row=0, column=0, sticky="NSWE")
-
-    output_win = tk.Toplevel(root)
-    output_win.title("Output")
-    output_win.rowconfigure(0, weight=1)
-    output_win.columnconfigure(0, weight=1)
-    output = OutputFrame(output_win, frame, frame.w_team, frame.b_team,
-                         frame.game)
-    output.grid(row=0, column=0, sticky="NSWE")
-
-    root.mainloop()
+    frame = InputFrame(root, checkpoint_fp="check.ckpt")
+    frame.clock.tick()
+    assert frame.live.state is frame.state and not frame.log.closed
+    print(f"Ticked {frame.clock.ticks} times, showing "
+          f"{frame.view.get('time')} {frame.view.get('stage')}")
+    frame.clock.stop()
+    frame.destroy()  # Closes the log, checkpoint and saver
+    root.destroy()
+    return None
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "check" in sys.argv:
+        check()
+    else:
+        root = tk.Tk()
+        root.title("Input")
+        root.rowconfigure(0, weight=1)
+        root.columnconfigure(0, weight=1)
+
+        frame = InputFrame(root, "results.json", 10, 2)
+        frame.grid(row=0, column=0, sticky="NSWE")
+
+        output_win = tk.Toplevel(root)
+        output_win.title("Output")
+        output_win.rowconfigure(0, weight=1)
+        output_win.columnconfigure(0, weight=1)
+        output = OutputFrame(output_win, frame)
+        output.grid(row=0, column=0, sticky="NSWE")
+
+        root.mainloop()
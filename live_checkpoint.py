@@ -0,0 +1,249 @@
+"""A fixed-layout, memory-mapped checkpoint of the game being played.
+
+v1 - Written on every tick and event, read back to resume after a crash
+v1.1 - Keeps the penalties being served
+v1.2 - Keeps the timeout being taken, and the last timeouts taken
+v1.3 - Events are synced to disk on a thread, not the Tk loop
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from game_state import GameState, TIMEOUTS
+
+OVERTIMES = ("No Overtime", "Extra Time", "Golden Goal")
+PENALTIES = 8  # Most penalties kept at once
+TIMEOUT_KINDS = ("",) + tuple(TIMEOUTS)  # 0 if no timeout
+TIMEOUTS_KEPT = 8  # Most timeouts taken that are kept, the latest ones
+# seq, game, finished, overtime, stage_index, w_score, b_score, time, half,
+# ot_time, ot_break, start_time (seconds since midnight), elapsed_ns,
+# wall_ns, w_team, b_team, penalties given, then the colour, number and
+# deadline of each penalty being served, the timeout being taken, then the
+# kind, stage index, start and length in tenths of each timeout taken,
+# then a CRC of everything before it
+RECORD = struct.Struct(f"<QIBBBxHHHHHHIqq32s32sH{PENALTIES}s"
+                       f"{PENALTIES}H{PENALTIES}qB{TIMEOUTS_KEPT}B"
+                       f"{TIMEOUTS_KEPT}B{TIMEOUTS_KEPT}H{TIMEOUTS_KEPT}I")
+CRC = struct.Struct("<I")
+SLOT = RECORD.size + CRC.size
+
+
+class LiveCheckpoint:
+    """Keeps the state of a game in a small memory-mapped file.
+
+    Each write packs the state straight into the map, so there is no
+    serialising or system call on the tick path. Writes alternate between
+    two slots, each with a sequence number and CRC, so a crash halfway
+    through a write still leaves the previous one to resume from.
+
+    After each event the file is fsync'd on a sync thread. fsync writes
+    back the map's pages too, and unlike mmap.flush() it lets the Tk
+    thread run while the disk catches up.
+    """
+
+    def __init__(self, state: GameState, fp: str = "live_game.ckpt") -> None:
+        """Map the checkpoint file and write the game's state to it.
+
+        state: game to keep, its listeners get this checkpoint added
+        """
+        self.state = state
+        self.fp = fp
+        with open(fp, "a+b") as f:
+            f.truncate(2 * SLOT)
+            self.map = mmap.mmap(f.fileno(), 2 * SLOT)
+        self.fd = os.open(fp, os.O_RDWR)  # Synced by the sync thread
+        self.dirty = threading.Event()  # Set when an event needs syncing
+        self.running = True
+        self.syncer = threading.Thread(target=self.sync,
+                                       name="LiveCheckpoint", daemon=True)
+        self.syncer.start()
+        # Carry on the sequence of a checkpoint already in the file
+        slots = (read_slot(self.map, 0), read_slot(self.map, 1))
+        self.seq = max((fields[0] for fields in slots if fields), default=0)
+        self.write()
+        state.listeners.append(self.record)
+
+    def write(self) -> None:
+        """Write the current state to the older of the two slots."""
+        state = self.state
+        start = state.start_time
+        penalties = list(state.penalties.items())[:PENALTIES]
+        numbers = [int(key[1:]) for key, colour in penalties]
+        deadlines = [state.timers.deadline(key) for key, colour in penalties]
+        padding = [0] * (PENALTIES - len(penalties))
+        timeouts = state.timeouts[-TIMEOUTS_KEPT:]
+        names = [stage.name for stage in state.timeline.stages]
+        timeout_padding = [0] * (TIMEOUTS_KEPT - len(timeouts))
+        self.seq += 1
+        offset = (self.seq % 2) * SLOT
+        RECORD.pack_into(
+            self.map, offset, self.seq, state.game, state.finished,
+            OVERTIMES.index(state.overtime), state.stage_index,
+            state.w_score, state.b_score, state.time, state.half,
+            state.ot_time, state.ot_break,
+            start.hour*3600 + start.minute*60 + start.second,
+            state.clock.elapsed_ns(), time.time_ns(),
+            state.w_team.encode()[:32], state.b_team.encode()[:32],
+            state.penalty_count,
+            "".join(colour for key, colour in penalties).encode(),
+            *numbers, *padding, *deadlines, *padding,
+            TIMEOUT_KINDS.index(state.timeout or ""),
+            *[TIMEOUT_KINDS.index(timeout["type"]) for timeout in timeouts],
+            *timeout_padding,
+            *[names.index(timeout["stage"]) for timeout in timeouts],
+            *timeout_padding,
+            *[timeout["start"] for timeout in timeouts], *timeout_padding,
+            *[round(timeout["length"] * 10) for timeout in timeouts],
+            *timeout_padding)
+        CRC.pack_into(self.map, offset + RECORD.size,
+                      zlib.crc32(self.map[offset:offset + RECORD.size]))
+        return None
+
+    def record(self, kind: str, data: dict) -> None:
+        """Write the state after an event. Used as a GameState listener.
+
+        Events are also synced to disk, so goals survive a power cut, not
+        just the program crashing. Ticks are left to the OS to write back.
+        """
+        self.write()
+        self.dirty.set()
+        return None
+
+    def sync(self) -> None:
+        """fsync the file after events until closed. Runs on the sync
+        thread, events during a fsync share the next one.
+        """
+        while True:
+            self.dirty.wait()
+            self.dirty.clear()
+            if not self.running:
+                break
+            os.fsync(self.fd)
+        return None
+
+    def close(self) -> None:
+        """Stop writing and unmap the file, leaving the last state in it."""
+        if self.record in self.state.listeners:
+            self.state.listeners.remove(self.record)
+        if not self.map.closed:
+            self.running = False
+            self.dirty.set()
+            self.syncer.join()
+            self.map.flush()
+            self.map.close()
+            os.close(self.fd)
+        return None
+
+
+def read_slot(data, slot: int) -> tuple | None:
+    """Return the fields in a slot, or None if it is empty or torn."""
+    offset = slot * SLOT
+    if len(data) < offset + SLOT:
+        return None
+    record = bytes(data[offset:offset + RECORD.size])
+    (crc,) = CRC.unpack_from(data, offset + RECORD.size)
+    if zlib.crc32(record) != crc:
+        return None
+    fields = RECORD.unpack(record)
+    return fields if fields[0] else None
+
+
+def load(fp: str = "live_game.ckpt",
+         time_source=time.monotonic_ns) -> GameState | None:
+    """Return the game in a checkpoint, running, or None if it finished.
+
+    The clock carries on from the last write plus the real time since it,
+    as the game kept being played while the scorer was down.
+    """
+    try:
+        with open(fp, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    slots = [fields for fields in (read_slot(data, 0), read_slot(data, 1))
+             if fields]
+    if not slots:
+        return None
+    fields = max(slots)
+    (seq, game, finished, overtime, stage_index, w_score, b_score, length,
+     half, ot_time, ot_break, start, elapsed_ns, wall_ns, w_team, b_team,
+     penalty_count, colours) = fields[:18]
+    numbers = fields[18:18 + PENALTIES]
+    deadlines = fields[18 + PENALTIES:18 + 2*PENALTIES]
+    timeout = fields[18 + 2*PENALTIES]
+    # Kinds, stage indexes, starts and lengths of the timeouts taken
+    taken = fields[19 + 2*PENALTIES:]
+    kinds, stages, starts, lengths = (
+        taken[i:i + TIMEOUTS_KEPT]
+        for i in range(0, 4*TIMEOUTS_KEPT, TIMEOUTS_KEPT))
+    if finished:
+        return None
+
+    hours, rest = divmod(start, 3600)
+    checkpoint = {
+        "setup": {"time": length, "half": half,
+                  "overtime": OVERTIMES[overtime], "ot_time": ot_time,
+                  "ot_break": ot_break,
+                  "w_team": w_team.rstrip(b"\0").decode(errors="ignore"),
+                  "b_team": b_team.rstrip(b"\0").decode(errors="ignore"),
+                  "game": game},
+        "w_score": w_score,
+        "b_score": b_score,
+        "stage_index": stage_index,
+        "finished": False,
+        "start_time": f"{hours:02}:{rest//60:02}:{rest%60:02}",
+        "penalties": [[f"{colour}{number}", colour, deadline]
+                      for colour, number, deadline in zip(
+                          colours.rstrip(b"\0").decode(), numbers,
+                          deadlines)],
+        "penalty_count": penalty_count,
+        "timeout": TIMEOUT_KINDS[timeout] or None
+    }
+    if not timeout:
+        # The game time stood still if a timeout was being taken
+        elapsed_ns += max(time.time_ns() - wall_ns, 0)
+    state = GameState.restore(checkpoint, elapsed_ns, time_source)
+    state.timeouts = [{"type": TIMEOUT_KINDS[kind],
+                       "stage": state.timeline.stages[stage].name,
+                       "start": start, "length": length / 10}
+                      for kind, stage, start, length in zip(
+                          kinds, stages, starts, lengths) if kind]
+    return state
+
+
+if __name__ == "__main__":
+    # Time writing a checkpoint, and resuming from one in a new process
+    import subprocess
+    import sys
+    import tempfile
+
+    fp = os.path.join(tempfile.mkdtemp(), "live_game.ckpt")
+    state = GameState(10, 2, "Extra Time", 5, 1, "NZ", "AUS", game=7)
+    state.start()
+    live = LiveCheckpoint(state, fp)
+    state.add_score("w")
+
+    writes = 100000
+    start = time.perf_counter()
+    for i in range(writes):
+        live.write()
+    taken = time.perf_counter() - start
+    print(f"Write: {taken/writes*1e6:.2f} us")
+    start = time.perf_counter()
+    for i in range(1000):
+        live.record("score", {})
+    taken = time.perf_counter() - start
+    print(f"Event on the Tk thread: {taken/1000*1e6:.2f} us")
+    live.close()  # As if the scorer crashed
+
+    code = ("import time; start = time.perf_counter(); "
+            "import live_checkpoint; "
+            f"state = live_checkpoint.load({fp!r}); "
+            "print(f'Cold resume: {(time.perf_counter()-start)*1000:.1f} ms,',"
+            " state.w_team, state.w_score, state.b_team, state.b_score,"
+            " state.stage.name)")
+    subprocess.run([sys.executable, "-c", code],
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
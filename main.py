@@ -6,15 +6,31 @@ and an output window to view the scores and times
 
 v1 - Uses setup info to run input and output
 v2 - Saves game results after the game
+v3 - Broadcasts the game to remote displays
+v3.1 - Keeps the standings up to date with saved results
+v3.2 - Offers to resume a game that didn't finish
+v3.3 - Resumes from the live checkpoint, falling back to the event log
+v3.4 - Profiles each tick when run with --profile
+v3.5 - Draws the output on a canvas when run with --canvas
 
 Created by Luke Marshall
 08/08/25
 """
 
+import sys
 import tkinter as tk
+from tkinter import messagebox
 from setup import SetupFrame
 from input import InputFrame
 from output import OutputFrame
+from output_canvas import OutputCanvas
+from broadcast import BroadcastServer
+from standings import Standings
+from event_log import find_unfinished, rebuild
+import live_checkpoint
+from tick_profiler import TickProfiler
+
+BROADCAST_PORT = 8765  # TCP port remote displays connect to
 
 
 class Main(tk.Tk):
@@ -31,12 +47,40 @@ class Main(tk.Tk):
         self.frame = SetupFrame(self)
         self.frame.grid(row=0, column=0, sticky="NSWE")
 
+        self.standings = Standings.from_file("results.json")
+
+        self.broadcast = BroadcastServer(port=BROADCAST_PORT)
+        try:
+            self.broadcast.start()
+        except OSError:
+            # Port is in use, run without remote displays
+            self.broadcast = None
+
+        # Offer to carry on a game that was running when the scorer closed
+        state = live_checkpoint.load()
+        if state is None:
+            log_fp = find_unfinished()
+            if log_fp is not None:
+                state = rebuild(log_fp)
+        if state is not None:
+            m = (f"Game no. {state.game} ({state.w_team} v {state.b_team}) "
+                 "didn't finish. Resume it?")
+            if messagebox.askyesno("Resume Game", m):
+                self.to_input({}, state)
+
         self.mainloop()
 
-    def to_input(self, outputs: dict) -> None:
-        """Close setup frame and open input frame and output window."""
+    def to_input(self, outputs: dict, state=None) -> None:
+        """Close setup frame and open input frame and output window.
+
+        state: GameState to carry on instead of starting a new game
+        """
         self.frame.destroy()
-        self.frame = InputFrame(self, "results.json", **outputs)
+        self.frame = InputFrame(self, "results.json", **outputs,
+                                broadcast=self.broadcast,
+                                standings=self.standings, state=state,
+                                profiler=(TickProfiler() if "--profile"
+                                          in sys.argv else None))
         self.frame.grid(row=0, column=0, sticky="NSWE")
         self.title("Input")
 
@@ -45,9 +89,10 @@ class Main(tk.Tk):
         self.output_win.rowconfigure(0, weight=1)
         self.output_win.columnconfigure(0, weight=1)
         self.output_win.geometry("+0+350")
-        self.output = OutputFrame(self.output_win, self.frame,
-                                  self.frame.w_team, self.frame.b_team,
-                                  self.frame.game)
+        if "--canvas" in sys.argv:
+            self.output = OutputCanvas(self.output_win, self.frame)
+        else:
+            self.output = OutputFrame(self.output_win, self.frame)
         self.output.grid(row=0, column=0, sticky="NSWE")
 
 
@@ -0,0 +1,235 @@
+"""Runs underwater hockey games on several courts at once.
+
+v1 - One scheduler tick and one results writer shared by every court
+v1.1 - Shows the live standings in their own window
+v1.2 - Each court keeps its own live checkpoint
+v1.3 - Ticks 10 times a second while any court shows tenths
+v1.4 - Wakes up for the next penalty end on any court
+v1.5 - Courts have no hotkeys, as they share one keyboard
+v1.6 - Courts that didn't finish are resumed from their live checkpoints
+v1.7 - Wakes up for the next timeout end on any court
+"""
+
+import os
+import tkinter as tk
+import live_checkpoint
+from game_clock import GameClock, NS_PER_SEC
+from input import InputFrame
+from output import OutputFrame
+from save_worker import SaveWorker
+from setup import SetupFrame
+from standings import Standings, StandingsFrame
+
+
+def checkpoint_path(court: int) -> str:
+    """Return the file path of a court's live checkpoint."""
+    return f"live_court{court}.ckpt"
+
+
+class CourtController:
+    """Runs a game on each court from a single drift-free clock.
+
+    Every court gets its own input and output windows, but they all share
+    one Tk interpreter, one after() loop and one results writer, so
+    results from different courts can't overwrite each other.
+    """
+
+    def __init__(self, master: tk.Tk, save_fp: str = "results.json") -> None:
+        """Create controller and start the shared clock.
+
+        master: tkinter root window
+        save_fp: file path every court saves its results to
+        """
+        self.master = master
+        self.saver = SaveWorker(master, save_fp)
+        self.save_fp = save_fp
+        self.courts = []  # InputFrame of each court, in court order
+
+        # Live standings, updated as each court saves its result
+        self.standings = Standings.from_file(save_fp)
+        self.standings_win = tk.Toplevel(master)
+        self.standings_win.title("Standings")
+        self.standings_win.rowconfigure(0, weight=1)
+        self.standings_win.columnconfigure(0, weight=1)
+        StandingsFrame(self.standings_win, self.standings).grid(
+            row=0, column=0, sticky="NSWE")
+
+        # Every court's clock is lined up with this one
+        self.clock = GameClock(master, self.tick)
+        self.clock.deadline = self.next_deadline
+        self.clock.start()
+
+    def unfinished(self) -> list:
+        """Return the GameState of each court's game that didn't finish,
+        in court order, from their live checkpoints.
+        """
+        states = []
+        court = 1
+        while os.path.exists(checkpoint_path(court)):
+            state = live_checkpoint.load(checkpoint_path(court))
+            if state is not None:
+                states.append(state)
+            court += 1
+        return states
+
+    def resume(self, states: list) -> None:
+        """Carry on games that didn't finish, e.g. after a crash.
+
+        states: GameState of each game, from unfinished(). They become
+                courts 1, 2, ... and any other checkpoints are removed, so
+                they aren't resumed again
+        """
+        for state in states:
+            self.add_court(state=state)
+        court = len(self.courts) + 1
+        while os.path.exists(checkpoint_path(court)):
+            os.remove(checkpoint_path(court))
+            court += 1
+        return None
+
+    def add_court(self, state=None, **setup) -> InputFrame:
+        """Open input and output windows and start a game on a new court.
+
+        state: GameState to carry on instead of starting a new game
+        setup: InputFrame arguments from SetupFrame, e.g. time and teams
+        """
+        court = len(self.courts) + 1
+        input_win = tk.Toplevel(self.master)
+        input_win.title(f"Court {court} Input")
+        input_win.rowconfigure(0, weight=1)
+        input_win.columnconfigure(0, weight=1)
+        frame = InputFrame(input_win, self.save_fp, **setup,
+                           saver=self.saver, standings=self.standings,
+                           namespace=f"input{court}",
+                           scheduled=False, state=state,
+                           checkpoint_fp=checkpoint_path(court),
+                           keys={})
+        frame.grid(row=0, column=0, sticky="NSWE")
+
+        if state is None:
+            # Start the game on the next tick of the shared clock
+            next_tick = (self.clock.start_ns +
+                         (self.clock.elapsed() + 1) * NS_PER_SEC)
+            frame.state.start(next_tick)
+        frame.update()
+
+        # Output is a child of the input, so they close together
+        output_win = tk.Toplevel(input_win)
+        output_win.title(f"Court {court} Output")
+        output_win.rowconfigure(0, weight=1)
+        output_win.columnconfigure(0, weight=1)
+        output = OutputFrame(output_win, frame, namespace=f"output{court}")
+        output.grid(row=0, column=0, sticky="NSWE")
+
+        self.courts.append(frame)
+        return frame
+
+    def tick(self, elapsed: int) -> None:
+        """Update every court still playing.
+
+        Once per second, or every tenth while any court shows tenths.
+        """
+        interval_ns = NS_PER_SEC
+        for frame in self.courts:
+            if not frame.state.finished and frame.winfo_exists():
+                frame.update()
+                interval_ns = min(interval_ns, frame.clock.interval_ns)
+        self.clock.interval_ns = interval_ns
+        return None
+
+    def next_deadline(self) -> int | None:
+        """Return the soonest stage, penalty or timeout end of any court."""
+        deadlines = []
+        for frame in self.courts:
+            if frame.state.finished or not frame.winfo_exists():
+                continue
+            pause_deadline = frame.state.pause_timers.next_deadline()
+            if pause_deadline is not None:
+                # On the time source, as the court's clock is stopped
+                deadlines.append(pause_deadline - self.clock.start_ns -
+                                 self.clock.paused_ns)
+            deadline = frame.state.next_deadline()
+            if deadline is not None and frame.clock.paused_at is None:
+                # Each court's clock started on a different tick, and has
+                # stood still for its own timeouts. A paused court's
+                # deadlines don't come until it is resumed
+                deadlines.append(frame.clock.start_ns +
+                                 frame.clock.paused_ns + deadline -
+                                 self.clock.start_ns)
+        return min(deadlines, default=None)
+
+    def close(self) -> None:
+        """Stop the clock and finish writing any saves."""
+        self.clock.stop()
+        self.saver.close()
+        return None
+
+
+class CourtSetup(tk.Toplevel):
+    """Window to set up the game on a new court."""
+
+    def __init__(self, controller: CourtController) -> None:
+        """Create setup window."""
+        super().__init__(controller.master)
+        self.controller = controller
+        self.title(f"Court {len(controller.courts) + 1} Setup")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self.frame = SetupFrame(self)
+        self.frame.grid(row=0, column=0, sticky="NSWE")
+
+    def to_input(self, outputs: dict) -> None:
+        """Close setup window and start the game on the new court."""
+        self.destroy()
+        self.controller.add_court(**outputs)
+        return None
+
+
+def measure() -> None:
+    """Print the CPU and memory each extra court costs, without Tk."""
+    import time
+    import tracemalloc
+    from game_state import GameState
+
+    for courts in (1, 3, 6, 12):
+        tracemalloc.start()
+        states = [GameState(10, 2, "Extra Time", 5, 1, game=court)
+                  for court in range(courts)]
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        for state in states:
+            state.start()
+
+        ticks = 2000
+        start = time.perf_counter()
+        for elapsed in range(ticks):
+            for state in states:
+                state.tick(elapsed)
+        taken = (time.perf_counter() - start) / ticks
+        print(f"{courts} courts: {taken*1e6/courts:.2f} us per court per "
+              f"tick, {memory/courts/1024:.1f} KiB per court")
+    return None
+
+
+if __name__ == "__main__":
+    import sys
+    from tkinter import messagebox, ttk
+
+    if "measure" in sys.argv:
+        measure()
+    else:
+        root = tk.Tk()
+        root.title("Courts")
+        controller = CourtController(root)
+        states = controller.unfinished()
+        if states and not messagebox.askyesno(
+                "Resume Games", f"{len(states)} court(s) didn't finish their "
+                "games. Resume them?"):
+            states = []
+        controller.resume(states)
+        ttk.Button(root, text="Add Court",
+                   command=lambda: CourtSetup(controller)).pack(
+                       padx=10, pady=10)
+        root.protocol("WM_DELETE_WINDOW",
+                      lambda: (controller.close(), root.destroy()))
+        root.mainloop()
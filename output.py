@@ -1,14 +1,22 @@
 """A frame or window to view to score/time of an underwater hockey game.
 
 v1 - Displays the time left, stage, real time, team names and scores
+v1.1 - Team names are read from the game state
+v1.2 - Uses the shared style, with its own background style
+v1.3 - Style namespace can be given, for several games at once
+v1.4 - Clock and score fonts grow to fit the window
+v1.5 - Refits the clock font when tenths start or stop being shown
+v1.6 - Benchmark of fitting the fonts and handling resizes
 
 Created by Luke Marshall
 05/08/25
 """
 
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk
-from custom_style import CustomStyle
+from custom_style import get_style
+from font_fit import FontFitter, RESIZE_DELAY_MS, SHAPE
 
 
 class OutputFrame(ttk.Frame):
@@ -18,22 +26,34 @@ class OutputFrame(ttk.Frame):
     """
 
     def __init__(self, master: tk.Tk | ttk.Frame, input_frame,
-                 w_team: str = "WHITE TEAM", b_team: str = "BLACK TEAM",
-                 game: int = 1) -> None:
-        """Create input frame."""
+                 namespace: str = "output") -> None:
+        """Create output frame.
+
+        input_frame: InputFrame running the game, whose state is shown
+        namespace: style namespace for this window's background colour
+        """
         super().__init__(master)  # Inherit methods from ttk.Frame
 
         self.input = input_frame
-        self.style = CustomStyle(self)
+        self.style = get_style(self)
+        self.configure(style=self.style.add_namespace(namespace))
+        # Show the same stage colour as the input window
+        self.input.namespaces.append(namespace)
+        self.style.set_stage(self.input.state.stage.type, namespace)
         self.rowconfigure(list(range(2)), weight=1)
         self.columnconfigure(list(range(3)), weight=1)
         self.pad = 5  # Padding between widgets
         self.ipad = 10  # Padding inside widgets
         self.bd = 1  # Border width of widgets
 
-        self.w_team = w_team
-        self.b_team = b_team
-        self.game = game
+        self.state = self.input.state
+
+        # Fonts of the clock and scores, sized to fit their boxes
+        self.fitter = FontFitter(self, self.style.lrg_font[0])
+        self.time_font = tkfont.Font(self, font=self.style.lrg_font)
+        self.score_font = tkfont.Font(self, font=self.style.lrg_font)
+        self.fit_id = None  # Id of the waiting fit_fonts() call
+        self.fitted = None  # Shape of the time text the font fits
 
         # time_frm contains Time Left, stage, and actual time left labels
         self.time_frm = ttk.Frame(self, style="box.TFrame")
@@ -53,7 +73,8 @@ class OutputFrame(ttk.Frame):
 
         self.time_lbl = ttk.Label(self.time_frm,
                                   textvariable=self.input.time_var,
-                                  style="lrg.box.TLabel")
+                                  style="lrg.box.TLabel",
+                                  font=self.time_font)
         self.box_grid(self.time_lbl, 2, 0, "xy")
 
         # white_frm contains White, Name and score labels
@@ -67,13 +88,14 @@ class OutputFrame(ttk.Frame):
                                    style="med.white.box.TLabel")
         self.box_grid(self.white_lbl, 0, 0, "xy")
 
-        self.w_team_lbl = ttk.Label(self.white_frm, text=self.w_team,
+        self.w_team_lbl = ttk.Label(self.white_frm, text=self.state.w_team,
                                     style="white.box.TLabel")
         self.box_grid(self.w_team_lbl, 1, 0, "x")
 
         self.w_score_lbl = ttk.Label(self.white_frm,
                                      textvariable=self.input.w_score,
-                                     style="lrg.white.box.TLabel")
+                                     style="lrg.white.box.TLabel",
+                                     font=self.score_font)
         self.box_grid(self.w_score_lbl, 2, 0, "xy")
 
         # black_frm contains Black, Name and score labels
@@ -87,13 +109,14 @@ class OutputFrame(ttk.Frame):
                                    style="med.black.box.TLabel")
         self.box_grid(self.black_lbl, 0, 0, "xy")
 
-        self.b_team_lbl = ttk.Label(self.black_frm, text=self.b_team,
+        self.b_team_lbl = ttk.Label(self.black_frm, text=self.state.b_team,
                                     style="black.box.TLabel")
         self.box_grid(self.b_team_lbl, 1, 0, "x")
 
         self.b_score_lbl = ttk.Label(self.black_frm,
                                      textvariable=self.input.b_score,
-                                     style="lrg.box.TLabel")
+                                     style="lrg.box.TLabel",
+                                     font=self.score_font)
         self.box_grid(self.b_score_lbl, 2, 0, "xy")
 
         # Displays the actual time of day
@@ -115,8 +138,47 @@ class OutputFrame(ttk.Frame):
                                  style="box.TLabel")
         self.box_grid(self.num_lbl, 0, 0, "xy")
 
+        self.bind("<Configure>", self.resized)
+        self.input.view.listeners.append(self.time_changed)
         self.update()
 
+    def resized(self, event: tk.Event) -> None:
+        """Fit the fonts once the window has stopped changing size."""
+        if self.fit_id is not None:
+            self.after_cancel(self.fit_id)
+        self.fit_id = self.after(RESIZE_DELAY_MS, self.fit_fonts)
+        return None
+
+    def fit_fonts(self) -> None:
+        """Make the clock and scores as big as their boxes allow."""
+        self.fit_id = None
+        time_text = self.input.view.get("time")
+        self.fitted = time_text.translate(SHAPE)
+        for font, label, text in (
+                (self.time_font, self.time_lbl, time_text),
+                (self.score_font, self.w_score_lbl, "00")):
+            size = -self.fitter.fit(text,
+                                    label.winfo_width() - 2*self.ipad,
+                                    label.winfo_height() - 2*self.ipad)
+            if font.cget("size") != size:
+                font.configure(size=size)
+        return None
+
+    def time_changed(self, changed: dict) -> None:
+        """Refit the fonts if the clock changed shape, e.g. to tenths."""
+        if ("time" in changed and self.fit_id is None and
+                self.fitted is not None and
+                changed["time"].translate(SHAPE) != self.fitted):
+            self.fit_fonts()
+        return None
+
+    def destroy(self) -> None:
+        """Stop following the input's view model, then destroy the frame."""
+        if self.time_changed in self.input.view.listeners:
+            self.input.view.listeners.remove(self.time_changed)
+        super().destroy()
+        return None
+
     def frame_grid(self, widget: ttk.Frame, row: int, column: int) -> None:
         """Add a frame into the grid."""
         widget.grid(row=row, column=column, sticky="NSWE",
@@ -138,5 +200,63 @@ class OutputFrame(ttk.Frame):
         return None
 
 
+def benchmark(steps: int = 50) -> None:
+    """Time fit_fonts() and the <Configure> events of dragging the window
+    from 720p to 4K and back. Needs a display.
+    """
+    import os
+    import tempfile
+    import time
+    from input import InputFrame
+
+    os.chdir(tempfile.mkdtemp())  # Keep the game's logs out of the way
+    root = tk.Tk()
+    frame = InputFrame(root, checkpoint_fp="benchmark.ckpt")
+    frame.grid(row=0, column=0, sticky="NSWE")
+    win = tk.Toplevel(root)
+    win.rowconfigure(0, weight=1)
+    win.columnconfigure(0, weight=1)
+    output = OutputFrame(win, frame)
+    output.grid(row=0, column=0, sticky="NSWE")
+
+    for width, height in ((1280, 720), (1920, 1080), (3840, 2160)):
+        win.geometry(f"{width}x{height}")
+        root.update()
+        start = time.perf_counter()
+        output.fit_fonts()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        output.fit_fonts()
+        again = time.perf_counter() - start
+        print(f"{width}x{height}: fit_fonts() first {first*1000:.2f} ms, "
+              f"memoised {again*1000:.3f} ms")
+
+    # A drag sends a <Configure> for every step, only the last one fits
+    fits = []
+    fit_fonts = output.fit_fonts
+    output.fit_fonts = lambda: (fits.append(1), fit_fonts())
+    taken = []
+    sizes = [(1280 + (3840-1280) * i // steps, 720 + (2160-720) * i // steps)
+             for i in range(steps + 1)]
+    for width, height in sizes + sizes[::-1]:
+        win.geometry(f"{width}x{height}")
+        start = time.perf_counter()
+        root.update()  # Lays out the window and handles its <Configure>
+        taken.append(time.perf_counter() - start)
+    root.after(RESIZE_DELAY_MS * 2, root.quit)
+    root.mainloop()
+    taken.sort()
+    print(f"Drag: {len(taken)} resizes, median {taken[len(taken)//2]*1000:.2f}"
+          f" ms, max {taken[-1]*1000:.2f} ms, fit_fonts() ran {len(fits)}"
+          " time(s)")
+    frame.clock.stop()
+    root.destroy()
+    return None
+
+
 if __name__ == "__main__":
-    pass
+    try:
+        benchmark()
+    except tk.TclError as error:
+        # Fonts can't be measured without a display
+        print(f"Not measured, benchmark() needs a display: {error}")
@@ -0,0 +1,225 @@
+"""A canvas to view the score/time of an underwater hockey game.
+
+v1 - Draws the output window's boxes on one canvas, instead of ~20 widgets
+v1.1 - Clock and score fonts grow to fit the window
+v1.2 - Refits the clock font when tenths start or stop being shown
+v1.3 - Red background during timeouts
+"""
+
+import tkinter as tk
+import tkinter.font as tkfont
+from custom_style import STAGE_BG, get_style
+from font_fit import FontFitter, RESIZE_DELAY_MS, SHAPE
+
+# Each box: (column, first unit, last unit) of the layout, where the top
+# row is 4 units high (header, name, then a 2 unit score) and the bottom
+# row is 1 unit. Then the colour scheme, font size and field it shows
+BOXES = {
+    "time_hdr": (1, 0, 1, "box", "med", None),
+    "stage": (1, 1, 2, "box", "", "stage"),
+    "time": (1, 2, 4, "box", "lrg", "time"),
+    "white_hdr": (0, 0, 1, "white", "med", None),
+    "w_team": (0, 1, 2, "white", "", None),
+    "w_score": (0, 2, 4, "white", "lrg", "w_score"),
+    "black_hdr": (2, 0, 1, "black", "med", None),
+    "b_team": (2, 1, 2, "black", "", None),
+    "b_score": (2, 2, 4, "box", "lrg", "b_score"),
+    "real": (0, 4, 5, "box", "", "real"),
+    "num": (2, 4, 5, "box", "", None),
+}
+
+
+class OutputCanvas(tk.Canvas):
+    """Canvas to view the underwater hockey game, like OutputFrame.
+
+    Every box is a rectangle and a text item on one canvas, so a resize is
+    one pass over the item coordinates instead of grid geometry for every
+    widget, and a stage change is one background colour change. Fields
+    are redrawn from the input's view model, only when their text changes.
+    """
+
+    def __init__(self, master: tk.Tk | tk.Toplevel, input_frame) -> None:
+        """Create output canvas.
+
+        input_frame: InputFrame running the game, whose state is shown
+        """
+        self.style = get_style(master)
+        super().__init__(master, highlightthickness=0,
+                         background=STAGE_BG[input_frame.state.stage.type])
+        self.input = input_frame
+        self.state = self.input.state
+        self.pad = 5  # Space between boxes
+        self.bd = 1  # Border width of boxes
+        self.stage_type = self.state.stage.type
+
+        colours = {
+            "box": (self.style.default_box_bg, self.style.default_box_fg),
+            "white": (self.style.white_bg, self.style.white_fg),
+            "black": (self.style.black_bg, self.style.black_fg),
+        }
+        # Fonts of the clock and scores, sized to fit their boxes
+        self.fitter = FontFitter(self, self.style.lrg_font[0])
+        self.time_font = tkfont.Font(self, font=self.style.lrg_font)
+        self.score_font = tkfont.Font(self, font=self.style.lrg_font)
+        self.fit_id = None  # Id of the waiting fit_fonts() call
+        self.fitted = None  # Shape of the time text the font fits
+        self.box = (0, 0)  # Width and height of the clock and score boxes
+        fonts = {"": self.style.font, "med": self.style.med_font,
+                 "lrg": self.style.lrg_font}
+        view = self.input.view
+        text = {"time_hdr": "Time Left", "white_hdr": "White",
+                "black_hdr": "Black", "w_team": self.state.w_team,
+                "b_team": self.state.b_team,
+                "num": self.input.num_var.get()}
+
+        # Rectangle and text item of each box, by box name
+        self.items = {}
+        self.fields = {}  # Box name of each view model field
+        for name, (column, top, bottom, colour, font, field) in BOXES.items():
+            bg, fg = colours[colour]
+            rect = self.create_rectangle(0, 0, 0, 0, fill=bg,
+                                         outline=self.style.bd,
+                                         width=self.bd)
+            if name == "time":
+                item_font = self.time_font
+            elif name in ("w_score", "b_score"):
+                item_font = self.score_font
+            else:
+                item_font = fonts[font]
+            label = self.create_text(
+                0, 0, fill=fg, font=item_font,
+                text=view.get(field) if field else text[name])
+            self.items[name] = (rect, label)
+            if field:
+                self.fields[field] = name
+
+        view.listeners.append(self.redraw)
+        self.bind("<Configure>", self.layout)
+
+    def layout(self, event: tk.Event) -> None:
+        """Move every box to fit the canvas's new size."""
+        pad = self.pad
+        column_w = (event.width - pad) / 3
+        unit_h = (event.height - 2*pad) / 5
+        for name, (column, top, bottom, colour, font,
+                   field) in BOXES.items():
+            x0 = pad + column*column_w
+            x1 = x0 + column_w - pad
+            # Boxes in the same column touch, sharing their borders
+            y0 = pad + top*unit_h + (pad if top == 4 else 0)
+            y1 = pad + bottom*unit_h
+            rect, label = self.items[name]
+            self.coords(rect, x0, y0, x1, y1)
+            self.coords(label, (x0 + x1) / 2, (y0 + y1) / 2)
+
+        # Fit the fonts once the window has stopped changing size
+        self.box = (int(column_w - pad), int(2*unit_h))
+        if self.fit_id is not None:
+            self.after_cancel(self.fit_id)
+        self.fit_id = self.after(RESIZE_DELAY_MS, self.fit_fonts)
+        return None
+
+    def fit_fonts(self) -> None:
+        """Make the clock and scores as big as their boxes allow."""
+        self.fit_id = None
+        width, height = self.box
+        time_text = self.input.view.get("time")
+        self.fitted = time_text.translate(SHAPE)
+        for font, text in ((self.time_font, time_text),
+                           (self.score_font, "00")):
+            size = -self.fitter.fit(text, width - 2*self.pad,
+                                    height - 2*self.pad)
+            if font.cget("size") != size:
+                font.configure(size=size)
+        return None
+
+    def redraw(self, changed: dict) -> None:
+        """Change the text of the fields that changed, from the view model.
+
+        Also changes the background when the stage changes.
+        """
+        for field, value in changed.items():
+            if field in self.fields:
+                self.itemconfigure(self.items[self.fields[field]][1],
+                                   text=value)
+        if ("time" in changed and self.fit_id is None and
+                self.fitted is not None and
+                changed["time"].translate(SHAPE) != self.fitted):
+            # Clock changed shape, e.g. to tenths
+            self.fit_fonts()
+        stage_type = ("Timeout" if self.state.timeout is not None
+                      else self.state.stage.type)
+        if "stage" in changed and stage_type != self.stage_type:
+            self.stage_type = stage_type
+            self.configure(background=STAGE_BG[self.stage_type])
+        return None
+
+    def destroy(self) -> None:
+        """Stop following the view model, then destroy the canvas."""
+        if self.redraw in self.input.view.listeners:
+            self.input.view.listeners.remove(self.redraw)
+        super().destroy()
+        return None
+
+
+def benchmark(cycles: int = 20) -> None:
+    """Time resizes and stage changes of OutputFrame and OutputCanvas.
+
+    Each is shown full screen at 4K, then resized to 1080p and back, and
+    cycled through every stage colour. Needs a display.
+    """
+    import os
+    import tempfile
+    import time
+    from input import InputFrame
+    from output import OutputFrame
+
+    os.chdir(tempfile.mkdtemp())  # Keep the game's logs out of the way
+    root = tk.Tk()
+    frame = InputFrame(root, checkpoint_fp="benchmark.ckpt")
+    frame.grid(row=0, column=0, sticky="NSWE")
+
+    for name, make in (("OutputFrame", lambda win: OutputFrame(win, frame)),
+                       ("OutputCanvas", lambda win: OutputCanvas(win,
+                                                                 frame))):
+        win = tk.Toplevel(root)
+        win.rowconfigure(0, weight=1)
+        win.columnconfigure(0, weight=1)
+        win.geometry("3840x2160+0+0")
+        output = make(win)
+        output.grid(row=0, column=0, sticky="NSWE")
+        root.update()
+
+        start = time.perf_counter()
+        for i in range(cycles):
+            for geometry in ("1920x1080", "3840x2160"):
+                win.geometry(geometry)
+                root.update()
+        resize = (time.perf_counter() - start) / (2*cycles)
+
+        start = time.perf_counter()
+        for i in range(cycles):
+            for stage, stage_type in (("Half-Time", "Break"),
+                                      ("Timeout", "Timeout"),
+                                      ("First Half", "Normal")):
+                # As a stage change in the input frame does
+                frame.state.stage = frame.state.stage._replace(
+                    name=stage, type=stage_type)
+                frame.change_stage(stage, stage_type)
+                frame.view.flush()
+                root.update()
+        stage = (time.perf_counter() - start) / (3*cycles)
+        print(f"{name}: resize {resize*1000:.2f} ms, "
+              f"stage change {stage*1000:.2f} ms")
+        win.destroy()
+    frame.clock.stop()
+    root.destroy()
+    return None
+
+
+if __name__ == "__main__":
+    try:
+        benchmark()
+    except tk.TclError as error:
+        # Nothing is drawn without a display, so there is nothing to time
+        print(f"Not measured, benchmark() needs a display: {error}")
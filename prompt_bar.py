@@ -0,0 +1,197 @@
+"""A bar of questions and messages inside a game window, instead of dialogs.
+
+v1 - Queued prompts that never block the window, with optional timeouts
+"""
+
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+from custom_style import get_style
+
+
+class PromptBar(ttk.Frame):
+    """Shows one question or message at a time in a strip of the window.
+
+    A messagebox runs its own event loop until it is answered, so no other
+    button or key works and the clock can't redraw. Here a prompt is just
+    widgets in the window, answered by a callback, so the game carries on
+    while it is shown. Prompts wait in a queue, and can answer themselves
+    after a timeout. The bar is hidden while there are none.
+    """
+
+    def __init__(self, master: tk.Misc, **grid) -> None:
+        """Create prompt bar.
+
+        grid: options to grid the bar with while it is shown
+        """
+        super().__init__(master, style="box.TFrame")
+        self.style = get_style(self)
+        self.grid_options = grid
+        self.columnconfigure(0, weight=1)
+        # Prompts waiting to be shown, each (title, message, answers,
+        # callback, timeout_ms, default)
+        self.prompts = deque()
+        self.shown = None  # Prompt being shown
+        self.after_id = None  # Id of the shown prompt's timeout
+
+        self.message_var = tk.StringVar(self, "")
+        self.message_lbl = ttk.Label(self, textvariable=self.message_var,
+                                     style="box.TLabel")
+        self.message_lbl.grid(row=0, column=0, sticky="NSWE", padx=1,
+                              pady=1, ipadx=10, ipady=10)
+        self.buttons = []  # Answer buttons of the shown prompt
+
+    def ask(self, title: str, message: str, callback=None,
+            timeout_ms: int | None = None, default: bool = False) -> None:
+        """Ask a yes/no question, like messagebox.askyesno.
+
+        callback: called with True or False once answered
+        timeout_ms: answers default after this long, never if None
+        """
+        self.add(title, message, (("Yes", True), ("No", False)), callback,
+                 timeout_ms, default)
+        return None
+
+    def notify(self, title: str, message: str,
+               timeout_ms: int | None = None) -> None:
+        """Show a message, like messagebox.showerror.
+
+        timeout_ms: hides it after this long, never if None
+        """
+        self.add(title, message, (("OK", None),), None, timeout_ms, None)
+        return None
+
+    def add(self, title: str, message: str, answers: tuple, callback,
+            timeout_ms: int | None, default) -> None:
+        """Queue a prompt, showing it now if none is shown.
+
+        answers: (button text, value the callback is given) of each button
+        """
+        self.prompts.append((title, message, answers, callback, timeout_ms,
+                             default))
+        if self.shown is None:
+            self.show_next()
+        return None
+
+    def show_next(self) -> None:
+        """Show the next prompt in the queue, or hide the bar if none."""
+        for button in self.buttons:
+            button.destroy()
+        self.buttons = []
+        if not self.prompts:
+            self.shown = None
+            self.grid_remove()
+            return None
+
+        self.shown = self.prompts.popleft()
+        title, message, answers, callback, timeout_ms, default = self.shown
+        waiting = f" (+{len(self.prompts)} more)" if self.prompts else ""
+        self.message_var.set(f"{title}: {message}{waiting}")
+        for column, (text, value) in enumerate(answers, 1):
+            button = ttk.Button(self, text=text,
+                                command=lambda value=value: self.answer(
+                                    value))
+            button.grid(row=0, column=column, sticky="NSWE", padx=1, pady=1)
+            self.buttons.append(button)
+        if timeout_ms is not None:
+            self.after_id = self.after(timeout_ms,
+                                       lambda: self.answer(default))
+        self.grid(**self.grid_options)
+        return None
+
+    def answer(self, value) -> None:
+        """Answer the shown prompt, then show the next one."""
+        if self.shown is None:
+            return None
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+            self.after_id = None
+        callback = self.shown[3]
+        self.show_next()
+        # After the next prompt is shown, as the callback may add one
+        if callback is not None:
+            callback(value)
+        return None
+
+    def __len__(self) -> int:
+        """Return the number of prompts shown or waiting."""
+        return len(self.prompts) + (self.shown is not None)
+
+    def destroy(self) -> None:
+        """Drop any waiting prompts, then destroy the bar."""
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+            self.after_id = None
+        self.prompts.clear()
+        super().destroy()
+        return None
+
+
+def benchmark(presses: int = 200) -> None:
+    """Time goal presses until the score shows in the output, through
+    add_score()'s after_idle() and EventClock.displayed(), as a real press
+    is timed. With no prompt, with prompts showing in the bar, and for
+    goals confirmed in the bar. Needs a display.
+    """
+    import os
+    import tempfile
+    from input import InputFrame
+    from output import OutputFrame
+    from tick_profiler import RingBuffer
+
+    os.chdir(tempfile.mkdtemp())  # Keep the game's logs out of the way
+    root = tk.Tk()
+    frame = InputFrame(root, checkpoint_fp="benchmark.ckpt")
+    try:
+        frame.grid(row=0, column=0, sticky="NSWE")
+        output_win = tk.Toplevel(root)
+        output = OutputFrame(output_win, frame)
+        output.grid(row=0, column=0, sticky="NSWE")
+        root.update()
+
+        def press(confirm: bool) -> None:
+            """Press the white goal button, as <ButtonPress> then the
+            button's command, and wait for the score to be redrawn.
+            """
+            frame.pressed_ns = frame.events.time_source()
+            frame.white_btn.invoke()
+            if confirm:
+                frame.prompt.answer(True)
+            # Redraws the score labels, then runs displayed(), in order
+            root.update_idletasks()
+            return None
+
+        for name, open_prompts in (("No prompt", 0), ("Prompt open", 1),
+                                   ("5 prompts queued", 5)):
+            for i in range(open_prompts):
+                frame.prompt.notify("Saved", "Game no. 1 has been saved.")
+            root.update()
+            frame.events.latency = RingBuffer()
+            for i in range(presses):
+                press(False)
+            latency = frame.events.summary()["latency_ms"]
+            print(f"{name}: press to display median {latency[50]:.3f} ms, "
+                  f"max {latency[100]:.3f} ms, {len(frame.prompt)} shown")
+            while len(frame.prompt):
+                frame.prompt.answer(None)
+
+        # During a timeout every goal is asked about in the bar first
+        frame.start_timeout("Referee")
+        root.update()
+        for i in range(presses):
+            press(True)
+        latency = frame.events.summary()["confirmed_ms"]
+        print(f"Confirmed in the bar at once: press to display median "
+              f"{latency[50]:.3f} ms, max {latency[100]:.3f} ms")
+    finally:
+        frame.clock.stop()
+        root.destroy()
+    return None
+
+
+if __name__ == "__main__":
+    try:
+        benchmark()
+    except tk.TclError as error:
+        # Nothing is drawn without a display, so there is nothing to time
+        print(f"Not measured, benchmark() needs a display: {error}")
@@ -0,0 +1,307 @@
+"""A SQLite database of underwater hockey game results.
+
+v1 - Indexed games, goals and save errors, imports results.json
+v1.1 - Keeps the timeouts taken in each game
+v1.2 - Goals can be taken back
+v1.3 - Every result can be read back in the results.json layout
+v1.4 - Keeps the playing and elapsed time of each game, as results.json does
+"""
+
+import json
+import sqlite3
+from datetime import date
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game INTEGER PRIMARY KEY,
+    w_team TEXT NOT NULL,
+    b_team TEXT NOT NULL,
+    w_score INTEGER NOT NULL,
+    b_score INTEGER NOT NULL,
+    start_time TEXT,
+    date TEXT,
+    playing_time INTEGER,
+    elapsed_time INTEGER
+);
+CREATE INDEX IF NOT EXISTS games_w_team ON games (w_team);
+CREATE INDEX IF NOT EXISTS games_b_team ON games (b_team);
+CREATE INDEX IF NOT EXISTS games_date ON games (date);
+
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY,
+    game INTEGER NOT NULL,
+    colour TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    seconds INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS goals_game ON goals (game);
+
+CREATE TABLE IF NOT EXISTS timeouts (
+    id INTEGER PRIMARY KEY,
+    game INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    length REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS timeouts_game ON timeouts (game);
+
+CREATE TABLE IF NOT EXISTS save_errors (
+    id INTEGER PRIMARY KEY,
+    game INTEGER,
+    w_team TEXT NOT NULL,
+    b_team TEXT NOT NULL,
+    w_score INTEGER NOT NULL,
+    b_score INTEGER NOT NULL,
+    start_time TEXT,
+    date TEXT,
+    playing_time INTEGER,
+    elapsed_time INTEGER
+);
+CREATE INDEX IF NOT EXISTS save_errors_game ON save_errors (game);
+"""
+
+# Columns of a game result, in table order. Times are in seconds, the time
+# played and the time since the start with timeouts
+COLUMNS = ("w_team", "b_team", "w_score", "b_score", "start_time", "date",
+           "playing_time", "elapsed_time")
+ADDED_COLUMNS = ("playing_time", "elapsed_time")  # Not in v1.3 databases
+# Column names and placeholders to insert a result with its game number
+RESULT_COLUMNS = "game, " + ", ".join(COLUMNS)
+RESULT_VALUES = ", ".join("?" * (len(COLUMNS) + 1))
+
+
+class ResultsDB:
+    """Saves results to a SQLite database in WAL mode.
+
+    Has the same add_result/add_goal methods as ResultsJournal, so either
+    can be used by InputFrame.
+    """
+
+    def __init__(self, fp: str = "results.db") -> None:
+        """Open the database, creating the tables if needed."""
+        self.fp = fp
+        self.conn = sqlite3.connect(fp)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.migrate()
+
+    def migrate(self) -> None:
+        """Add the columns a database made by an older version lacks."""
+        with self.conn:
+            for table in ("games", "save_errors"):
+                columns = {row["name"] for row in self.conn.execute(
+                    f"PRAGMA table_info({table})")}
+                for column in ADDED_COLUMNS:
+                    if column not in columns:
+                        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN "
+                                          f"{column} INTEGER")
+        return None
+
+    def row(self, result: dict) -> tuple:
+        """Return the column values of a result, dated today if not given."""
+        result = {"start_time": None, "date": date.today().isoformat(),
+                  "playing_time": None, "elapsed_time": None, **result}
+        return tuple(result[column] for column in COLUMNS)
+
+    def add_result(self, game: int, result: dict) -> bool:
+        """Save the result of a game.
+
+        Returns False if the game number has already been saved, the
+        result is then saved as a save error
+        """
+        try:
+            with self.conn:
+                self.conn.execute(
+                    f"INSERT INTO games ({RESULT_COLUMNS}) "
+                    f"VALUES ({RESULT_VALUES})",
+                    (int(game), *self.row(result)))
+                self.add_timeouts(game, result)
+            return True
+        except sqlite3.IntegrityError:
+            with self.conn:
+                self.conn.execute(
+                    f"INSERT INTO save_errors ({RESULT_COLUMNS}) "
+                    f"VALUES ({RESULT_VALUES})",
+                    (int(game), *self.row(result)))
+            return False
+
+    def add_timeouts(self, game: int, result: dict) -> None:
+        """Save the timeouts taken in a game, inside a transaction."""
+        self.conn.executemany(
+            "INSERT INTO timeouts (game, type, stage, start, length) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(int(game), timeout["type"], timeout["stage"],
+              timeout["start"], timeout["length"])
+             for timeout in result.get("timeouts", [])])
+        return None
+
+    def add_goal(self, game: int, colour: str, stage: str,
+                 seconds: int) -> None:
+        """Save a goal event.
+
+        colour: 'w' or 'b'
+        stage: name of the stage the goal was scored in
+        seconds: seconds since the start of the game
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO goals (game, colour, stage, seconds) "
+                "VALUES (?, ?, ?, ?)", (int(game), colour, stage, seconds))
+        return None
+
+    def remove_goal(self, game: int, colour: str, stage: str,
+                    seconds: int) -> None:
+        """Take back a goal saved by add_goal(), e.g. given by mistake."""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM goals WHERE id = (SELECT MAX(id) FROM goals "
+                "WHERE game = ? AND colour = ? AND stage = ? AND "
+                "seconds = ?)", (int(game), colour, stage, seconds))
+        return None
+
+    def game(self, game: int) -> dict | None:
+        """Return the result of a game, or None if not saved."""
+        row = self.conn.execute("SELECT * FROM games WHERE game = ?",
+                                (int(game),)).fetchone()
+        return None if row is None else dict(row)
+
+    def results(self) -> dict:
+        """Return every result with its timeouts, keyed by game number as
+        in results.json.
+        """
+        results = {}
+        for row in self.conn.execute("SELECT * FROM games ORDER BY game"):
+            result = dict(row)
+            game = str(result.pop("game"))
+            results[game] = {**result, "timeouts": []}
+        for row in self.conn.execute(
+                "SELECT game, type, stage, start, length FROM timeouts "
+                "ORDER BY id"):
+            timeout = dict(row)
+            game = str(timeout.pop("game"))
+            if game in results:
+                results[game]["timeouts"].append(timeout)
+        return results
+
+    def games_for_team(self, team: str) -> list[dict]:
+        """Return all games a team played as white or black."""
+        rows = self.conn.execute(
+            "SELECT * FROM games WHERE w_team = ? OR b_team = ? "
+            "ORDER BY game", (team, team))
+        return [dict(row) for row in rows]
+
+    def games_on(self, day: str) -> list[dict]:
+        """Return all games played on a date, e.g. '2026-10-18'."""
+        rows = self.conn.execute(
+            "SELECT * FROM games WHERE date = ? ORDER BY game", (day,))
+        return [dict(row) for row in rows]
+
+    def goals(self, game: int) -> list[dict]:
+        """Return the goals scored in a game, in order."""
+        rows = self.conn.execute(
+            "SELECT colour, stage, seconds FROM goals WHERE game = ? "
+            "ORDER BY id", (int(game),))
+        return [dict(row) for row in rows]
+
+    def timeouts(self, game: int) -> list[dict]:
+        """Return the timeouts taken in a game, in order."""
+        rows = self.conn.execute(
+            "SELECT type, stage, start, length FROM timeouts "
+            "WHERE game = ? ORDER BY id", (int(game),))
+        return [dict(row) for row in rows]
+
+    def save_errors(self, game: int | None = None) -> list[dict]:
+        """Return the results that clashed, for one game or all games."""
+        if game is None:
+            rows = self.conn.execute("SELECT * FROM save_errors")
+        else:
+            rows = self.conn.execute(
+                "SELECT * FROM save_errors WHERE game = ?", (int(game),))
+        return [dict(row) for row in rows]
+
+    def next_game_number(self) -> int:
+        """Return the game number after the highest one saved."""
+        row = self.conn.execute("SELECT MAX(game) FROM games").fetchone()
+        return 1 if row[0] is None else row[0] + 1
+
+    def import_json(self, json_fp: str = "results.json") -> int:
+        """Copy the results in a results.json file into the database.
+
+        Games already in the database are added as save errors.
+        Returns the number of games imported
+        """
+        try:
+            with open(json_fp, "r") as f:
+                results = json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return 0
+
+        errors = [(None, *self.row({"date": None, **value}))
+                  for value in results.get("save_error", [])]
+        imported = 0
+        with self.conn:
+            for key, value in results.items():
+                if key == "save_error":
+                    continue
+                row = (int(key), *self.row({"date": None, **value}))
+                cursor = self.conn.execute(
+                    f"INSERT OR IGNORE INTO games ({RESULT_COLUMNS}) "
+                    f"VALUES ({RESULT_VALUES})", row)
+                if cursor.rowcount:
+                    self.add_timeouts(int(key), value)
+                    imported += 1
+                else:
+                    # Game number clashed, keep it as a save error
+                    errors.append(row)
+            self.conn.executemany(
+                f"INSERT INTO save_errors ({RESULT_COLUMNS}) "
+                f"VALUES ({RESULT_VALUES})", errors)
+        return imported
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+        return None
+
+
+if __name__ == "__main__":
+    # Benchmark lookups with 100k stored games
+    import os
+    import random
+    import tempfile
+    import time
+
+    folder = tempfile.mkdtemp()
+    teams = [f"T{i:02}" for i in range(64)]
+    results = {"save_error": []}
+    for game in range(1, 100_001):
+        w_team, b_team = random.sample(teams, 2)
+        results[str(game)] = {"w_team": w_team, "b_team": b_team,
+                              "w_score": random.randrange(8),
+                              "b_score": random.randrange(8),
+                              "start_time": "09:00:00"}
+    json_fp = os.path.join(folder, "results.json")
+    with open(json_fp, "w") as f:
+        json.dump(results, f)
+
+    db = ResultsDB(os.path.join(folder, "results.db"))
+    start = time.perf_counter()
+    db.import_json(json_fp)
+    print(f"Import 100k: {time.perf_counter()-start:.2f} s")
+
+    def timed(name, function, *args, repeat=1000):
+        """Print the mean time of a function call."""
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function(*args)
+        taken = (time.perf_counter() - start) / repeat
+        print(f"{name}: {taken*1e6:.1f} us")
+
+    timed("Game lookup", db.game, 54321)
+    timed("Next game number", db.next_game_number)
+    timed("Games for team", db.games_for_team, "T07", repeat=100)
+    timed("Save result", lambda: db.add_result(db.next_game_number(),
+                                               results["1"]), repeat=100)
+    timed("Game number clash", db.add_result, 1, results["1"], repeat=100)
@@ -0,0 +1,174 @@
+"""An append-only journal of underwater hockey game results.
+
+v1 - Appends one line per result/goal, compacts into results.json
+v1.1 - Goals can be taken back, and read back for a game
+v1.2 - Compaction is left to the caller's writer thread
+"""
+
+import json
+import os
+
+
+class ResultsJournal:
+    """Saves results by appending JSON lines to a journal file.
+
+    Each save is one fsync'd line, so it takes the same time however many
+    games are saved, and a crash can only lose the line being written.
+    compact() rebuilds the results.json layout from the journal.
+    """
+
+    def __init__(self, json_fp: str = "results.json",
+                 fp: str | None = None) -> None:
+        """Open the journal, creating it from json_fp if it doesn't exist.
+
+        json_fp: results.json file path that compact() writes to
+        fp: journal file path, defaults to json_fp with a .jsonl extension
+        """
+        self.json_fp = json_fp
+        self.fp = fp or os.path.splitext(json_fp)[0] + ".jsonl"
+        self.games = set()  # Game numbers already saved, to find clashes
+
+        if os.path.exists(self.fp):
+            for record in self.read():
+                if record["type"] == "result":
+                    self.games.add(str(record["game"]))
+            self.file = open(self.fp, "a", encoding="utf-8")
+            if self.file.tell() and not self.ends_with_newline():
+                # Last line was cut off by a crash, start a new line
+                self.file.write("\n")
+        else:
+            self.file = open(self.fp, "a", encoding="utf-8")
+            self.import_json()
+
+    def ends_with_newline(self) -> bool:
+        """Return True if the journal file ends with a newline."""
+        with open(self.fp, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def import_json(self) -> None:
+        """Copy the results in an existing results.json into the journal."""
+        try:
+            with open(self.json_fp, "r") as f:
+                results = json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return None
+        for key, value in results.items():
+            if key == "save_error":
+                for result in value:
+                    self.append({"type": "save_error", **result})
+            else:
+                self.append({"type": "result", "game": key, **value})
+                self.games.add(key)
+        return None
+
+    def append(self, record: dict) -> None:
+        """Write a record to the end of the journal and flush it to disk."""
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return None
+
+    def add_result(self, game: int, result: dict) -> bool:
+        """Save the result of a game.
+
+        Returns False if the game number has already been saved, the
+        result is then saved as a save error
+        """
+        if str(game) in self.games:
+            self.append({"type": "save_error", **result})
+            return False
+        self.append({"type": "result", "game": game, **result})
+        self.games.add(str(game))
+        return True
+
+    def add_goal(self, game: int, colour: str, stage: str,
+                 seconds: int) -> None:
+        """Save a goal event.
+
+        colour: 'w' or 'b'
+        stage: name of the stage the goal was scored in
+        seconds: seconds since the start of the game
+        """
+        self.append({"type": "goal", "game": game, "colour": colour,
+                     "stage": stage, "seconds": seconds})
+        return None
+
+    def remove_goal(self, game: int, colour: str, stage: str,
+                    seconds: int) -> None:
+        """Take back a goal saved by add_goal(), e.g. given by mistake."""
+        self.append({"type": "goal_removed", "game": game,
+                     "colour": colour, "stage": stage, "seconds": seconds})
+        return None
+
+    def goals(self, game: int) -> list[dict]:
+        """Return the goals scored in a game, in order, less any removed."""
+        goals = []
+        for record in self.read():
+            if str(record.get("game")) != str(game):
+                continue
+            goal = {key: record[key] for key in ("colour", "stage",
+                                                 "seconds")}
+            if record["type"] == "goal":
+                goals.append(goal)
+            elif record["type"] == "goal_removed" and goal in goals:
+                # Latest matching goal
+                del goals[len(goals) - 1 - goals[::-1].index(goal)]
+        return goals
+
+    def read(self):
+        """Yield each complete record in the journal."""
+        with open(self.fp, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    # Line cut off by a crash
+                    continue
+
+    def compact(self) -> None:
+        """Rebuild results.json from the journal.
+
+        Written to a temp file then renamed, so results.json is never
+        left half written.
+        """
+        results = {"save_error": []}
+        for record in self.read():
+            kind = record.pop("type")
+            if kind == "result":
+                results[str(record.pop("game"))] = record
+            elif kind == "save_error":
+                results["save_error"].append(record)
+
+        temp_fp = self.json_fp + ".tmp"
+        with open(temp_fp, "w") as f:
+            json.dump(results, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_fp, self.json_fp)
+        return None
+
+    def close(self) -> None:
+        """Close the journal file."""
+        self.file.close()
+        return None
+
+
+if __name__ == "__main__":
+    # Show that saving takes the same time however many results there are
+    import tempfile
+    import time
+
+    folder = tempfile.mkdtemp()
+    journal = ResultsJournal(os.path.join(folder, "results.json"))
+    result = {"w_team": "AAA", "b_team": "BBB", "w_score": 3,
+              "b_score": 2, "start_time": "09:00:00"}
+    for game in range(1, 5001):
+        start = time.perf_counter()
+        journal.add_result(game, result)
+        taken = time.perf_counter() - start
+        if game in (1, 10, 100, 1000, 5000):
+            print(f"Save {game}: {taken*1000:.3f} ms")
+    start = time.perf_counter()
+    journal.compact()
+    print(f"Compact 5000: {(time.perf_counter()-start)*1000:.1f} ms")
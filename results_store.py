@@ -0,0 +1,24 @@
+"""Picks the backend used to save underwater hockey game results.
+
+v1 - Journal for .json files, SQLite database for .db files
+"""
+
+import os
+from results_db import ResultsDB
+from results_journal import ResultsJournal
+
+
+def open_results(save_fp: str) -> ResultsDB | ResultsJournal:
+    """Open the results backend for a file path.
+
+    save_fp: .db or .sqlite for a ResultsDB, otherwise a results.json file
+    whose results are kept in a ResultsJournal
+    """
+    if os.path.splitext(save_fp)[1].lower() in (".db", ".sqlite"):
+        results = ResultsDB(save_fp)
+        # Bring across any results saved before the database existed
+        if results.next_game_number() == 1:
+            json_fp = os.path.splitext(save_fp)[0] + ".json"
+            results.import_json(json_fp)
+        return results
+    return ResultsJournal(save_fp)
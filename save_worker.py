@@ -0,0 +1,213 @@
+"""Saves underwater hockey game results on a background thread.
+
+v1 - Writer thread with a bounded queue, callbacks run on the Tk loop
+v1.1 - Saves fail with the error if the results file can't be opened
+v1.2 - results.json is rebuilt once saving goes quiet, not after every save
+"""
+
+import queue
+import threading
+from results_store import open_results
+
+COMPACT_IDLE_S = 2  # Seconds without saves before results.json is rebuilt
+
+
+class SaveWorker:
+    """Runs results backend methods on a dedicated writer thread.
+
+    The Tk main loop never waits for the disk. Completion and error
+    callbacks are passed back and run on the Tk loop with after().
+    """
+
+    def __init__(self, master, save_fp: str = "results.json",
+                 maxsize: int = 64, poll_ms: int = 20) -> None:
+        """Create save worker and start the writer thread.
+
+        master: tkinter widget used to run callbacks on the Tk loop
+        save_fp: file path given to open_results()
+        maxsize: most saves that can be waiting at once
+        poll_ms: how often finished saves are checked for
+        """
+        self.master = master
+        self.save_fp = save_fp
+        self.poll_ms = poll_ms
+        self.jobs = queue.Queue(maxsize)  # Saves waiting to be written
+        self.done = queue.Queue()  # Callbacks waiting to run on the Tk loop
+        self.pending = 0  # Saves submitted but not called back yet
+        self.poll_id = None
+        self.error = None  # Why the results file couldn't be opened, if so
+
+        # Not a daemon, so the last saves are written before exiting
+        self.thread = threading.Thread(target=self.run, name="SaveWorker")
+        self.thread.start()
+
+    def run(self) -> None:
+        """Write saves until close() is called. Runs on the writer thread."""
+        # sqlite connections can only be used by the thread that made them
+        try:
+            results = open_results(self.save_fp)
+        except Exception as error:
+            # e.g. no permission, or the database is locked or corrupt.
+            # Every save fails with this error, instead of waiting forever
+            self.error = error
+            while (job := self.jobs.get()) is not None:
+                self.done.put((job[3], error))
+            return None
+        # A journal's results.json is rebuilt from the whole journal, so
+        # only once no saves have come for a while, or at close, to keep
+        # each save constant time
+        stale = False  # Results saved since results.json was rebuilt
+        while True:
+            try:
+                job = self.jobs.get(timeout=COMPACT_IDLE_S if stale else None)
+            except queue.Empty:
+                stale = not self.compact(results)
+                continue
+            if job is None:
+                break
+            method, args, on_done, on_error = job
+            try:
+                value = getattr(results, method)(*args)
+                if method == "add_result" and hasattr(results, "compact"):
+                    stale = True
+                self.done.put((on_done, value))
+            except Exception as error:
+                self.done.put((on_error, error))
+        if stale:
+            self.compact(results)
+        results.close()
+        return None
+
+    def compact(self, results) -> bool:
+        """Rebuild a journal's results.json. Runs on the writer thread.
+
+        Returns False if it couldn't be written, e.g. the disk is full, so
+        it is tried again later. The saves are still in the journal
+        """
+        try:
+            results.compact()
+        except OSError:
+            return False
+        return True
+
+    def submit(self, method: str, *args, on_done=None,
+               on_error=None) -> None:
+        """Queue a results backend method to run on the writer thread.
+
+        method: e.g. 'add_result' or 'add_goal'
+        on_done: called on the Tk loop with the method's return value
+        on_error: called on the Tk loop with the exception if it failed
+        """
+        if self.error is not None or not self.thread.is_alive():
+            # Results file couldn't be opened, or the worker was closed,
+            # so nothing can be saved
+            if on_error is not None:
+                on_error(self.error or RuntimeError("Writer has stopped"))
+            return None
+        try:
+            self.jobs.put_nowait((method, args, on_done, on_error))
+        except queue.Full as error:
+            # Disk has stopped keeping up, don't block the Tk loop
+            if on_error is not None:
+                on_error(error)
+            return None
+        self.pending += 1
+        if self.poll_id is None:
+            self.poll_id = self.master.after(self.poll_ms, self.poll)
+        return None
+
+    def poll(self) -> None:
+        """Run the callbacks of finished saves on the Tk loop."""
+        self.poll_id = None
+        while True:
+            try:
+                callback, value = self.done.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if callback is not None:
+                callback(value)
+        if self.pending:
+            # Only keep polling while saves are outstanding
+            self.poll_id = self.master.after(self.poll_ms, self.poll)
+        return None
+
+    def close(self) -> None:
+        """Finish the queued saves and stop the writer thread."""
+        if self.poll_id is not None:
+            self.master.after_cancel(self.poll_id)
+            self.poll_id = None
+        if self.thread.is_alive():
+            self.jobs.put(None)
+            self.thread.join()
+        return None
+
+
+if __name__ == "__main__":
+    # Measure the worst main loop stall while saving, on top of a long
+    # tournament's results
+    import json
+    import os
+    import tempfile
+    import time
+    import tkinter as tk
+    from results_journal import ResultsJournal
+
+    root = tk.Tcl()  # Only the event loop is needed, not a display
+    folder = tempfile.mkdtemp()
+    result = {"w_team": "AAA", "b_team": "BBB", "w_score": 3,
+              "b_score": 2, "start_time": "09:00:00"}
+    history = 5000
+    journal = ResultsJournal(os.path.join(folder, "results.json"))
+    for game in range(1, history + 1):
+        journal.add_result(game, result)
+    journal.close()
+    worker = SaveWorker(root, os.path.join(folder, "results.json"))
+    written = []  # Time from each save being submitted to called back
+    gaps = []
+    running = True
+    closing = None  # Time close() took
+    last = time.perf_counter()
+
+    def beat() -> None:
+        """Record the gap between main loop wake-ups."""
+        global last
+        if not running:
+            return None
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+        root.after(1, beat)
+
+    def save(game: int) -> None:
+        """Submit a save every 10 ms."""
+        submitted = time.perf_counter()
+        worker.submit("add_result", history + game, result,
+                      on_done=lambda added: written.append(
+                          time.perf_counter() - submitted))
+        if game < 500:
+            root.after(10, save, game+1)
+        else:
+            root.after(500, finish)
+
+    def finish() -> None:
+        """Wait for the last saves, then stop the loop."""
+        global running, closing
+        running = False
+        start = time.perf_counter()
+        worker.close()
+        closing = time.perf_counter() - start
+
+    root.after(1, beat)
+    root.after(1, save, 1)
+    while running:
+        root.dooneevent()
+    print(f"Worst main loop stall: {max(gaps[1:])*1000:.1f} ms "
+          f"(one frame at 60 Hz is 16.7 ms)")
+    written.sort()
+    print(f"{len(written)} saves after {history} games: submit to saved "
+          f"median {written[len(written)//2]*1000:.1f} ms, max "
+          f"{written[-1]*1000:.1f} ms")
+    print(f"Close, rebuilding results.json once: {closing*1000:.1f} ms")
+    with open(os.path.join(folder, "results.json")) as f:
+        print(f"results.json has {len(json.load(f)) - 1} results")
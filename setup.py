@@ -4,6 +4,8 @@ v1 - Gets the time for the game and then starts it
 v1.1 - Displays total game length correctly
 v2 - Gets overtime procedure
 v3 - Gets team name abbreviations
+v3.1 - Total game length is worked out from the game timeline
+v3.2 - Uses the shared style
 
 Created by Luke Marshall
 15/08/25
@@ -11,7 +13,8 @@ Created by Luke Marshall
 
 import tkinter as tk
 from tkinter import ttk
-from custom_style import CustomStyle
+from custom_style import get_style
+from timeline import Timeline
 from widgets.int_entry import IntEntry
 from widgets.radio_buttons import RadioButtons
 from widgets.str_entry import StrEntry
@@ -27,7 +30,7 @@ class SetupFrame(ttk.Frame):
         """Create setup frame."""
         super().__init__(master)  # Inherit methods from ttk.Frame
 
-        self.style = CustomStyle(self)
+        self.style = get_style(self)
         self.rowconfigure(list(range(8)), weight=1)
         self.columnconfigure(list(range(2)), weight=1)
         self.pad = 10  # Padding between widgets
@@ -109,7 +112,7 @@ class SetupFrame(ttk.Frame):
         self.inputs["half"].required = True
         if time != "" and half != "":
             # Calculate total
-            total = 2*time + half
+            total = Timeline(time, half).length() // 60
             self.total_lbl.configure(text=f"Total Game Length: {total} min")
         else:
             # Not all inputs are given yet
@@ -130,7 +133,9 @@ class SetupFrame(ttk.Frame):
             if ot_time != "" and ot_break != "" and "total" in locals():
                 # If number inputs are all entered and total has been calcuated
                 # Add a worst case scenario time
-                ot_total = total + 2*ot_time + 2*ot_break
+                timeline = Timeline(time, half, "Extra Time", ot_time,
+                                    ot_break)
+                ot_total = timeline.length(overtime=True) // 60
                 text = f"Total Game Length: {total}-{ot_total} min"
                 self.total_lbl.configure(text=text)
         else:
@@ -0,0 +1,245 @@
+"""Simulates underwater hockey games on a virtual clock, without tkinter.
+
+v1 - Plays a whole tournament day in seconds and checks the game rules
+v1.1 - Gives penalties, and checks each is served for its time in play
+"""
+
+import random
+import time
+from fixtures import round_robin, schedule, game_slot
+from game_clock import NS_PER_SEC
+from game_state import GameState, PLAYING
+from standings import Standings
+
+OVERTIMES = ("No Overtime", "Extra Time", "Golden Goal")
+
+
+class VirtualClock:
+    """Time source for GameState that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.ns = 0
+
+    def __call__(self) -> int:
+        return self.ns
+
+    def set(self, seconds: int) -> None:
+        """Move the clock to a time in seconds."""
+        self.ns = seconds * NS_PER_SEC
+        return None
+
+
+def random_goals(rng: random.Random, length: int,
+                 rate: float = 4) -> list[tuple[int, str]]:
+    """Return (seconds, colour) goals for a game, in time order.
+
+    length: seconds goals can be scored in
+    rate: average goals per 1200 seconds (a 2x10 minute game)
+    """
+    count = sum(rng.random() < rate / 1200 * 60 for i in range(length // 60))
+    return sorted((rng.randrange(length), rng.choice("wb"))
+                  for i in range(count))
+
+
+def random_penalties(rng: random.Random, length: int,
+                     rate: float = 1) -> list[tuple[int, str, int]]:
+    """Return (seconds, colour, length) penalties for a game, in time order.
+
+    rate: average penalties per 1200 seconds
+    """
+    count = sum(rng.random() < rate / 1200 * 60 for i in range(length // 60))
+    return sorted((rng.randrange(length), rng.choice("wb"),
+                   rng.choice((60, 120, 300))) for i in range(count))
+
+
+class Simulation:
+    """Plays one game on a virtual clock and checks it against the rules.
+
+    Goals are scored at the scripted times, and a goal is added in golden
+    goal if there isn't one, so every game ends.
+    """
+
+    def __init__(self, setup: dict, goals: list[tuple[int, str]],
+                 every_second: bool = True,
+                 penalties: list[tuple[int, str, int]] = ()) -> None:
+        """Create simulation.
+
+        setup: GameState arguments, e.g. time, half and overtime
+        goals: (seconds, colour) goals in time order
+        every_second: tick every second as the clock would, else only jump
+                      to each goal and stage end
+        penalties: (seconds, colour, length) penalties in time order
+        """
+        self.clock = VirtualClock()
+        self.state = GameState(**setup, time_source=self.clock)
+        self.goals = goals
+        self.penalties = penalties
+        self.lengths = {}  # Length of each penalty given, by key
+        self.every_second = every_second
+        self.events = []  # (seconds, kind, data) recorded by the game
+        self.violations = []  # Broken rules, as messages
+        self.ticks = 0
+        self.state.listeners.append(self.record)
+
+    def record(self, kind: str, data: dict) -> None:
+        """Keep each event the game records, with the time."""
+        self.events.append((self.clock.ns // NS_PER_SEC, kind, data))
+        return None
+
+    def check(self, message: str, ok: bool) -> None:
+        """Add a violation if a rule was broken."""
+        if not ok:
+            self.violations.append(f"Game {self.state.game}: {message}")
+        return None
+
+    def run(self) -> GameState:
+        """Play the game to the end, then check its events."""
+        state = self.state
+        timeline = state.timeline
+        state.start()
+        # Time golden goal is scored if it isn't already
+        last = timeline.length(overtime=True) + 600
+        if self.every_second:
+            times = range(last + 1)
+        else:
+            times = sorted({seconds for seconds, colour in self.goals} |
+                           set(timeline.starts) | {last})
+        goals = iter(self.goals)
+        goal = next(goals, None)
+        penalties = iter(self.penalties)
+        penalty = next(penalties, None)
+        for seconds in times:
+            self.clock.set(seconds)
+            index = state.stage_index
+            state.tick()
+            self.ticks += 1
+            self.check_tick(index)
+            while goal is not None and goal[0] <= seconds:
+                state.add_score(goal[1])
+                goal = next(goals, None)
+            while penalty is not None and penalty[0] <= seconds:
+                colour, length = penalty[1:]
+                self.lengths[state.add_penalty(colour, length)] = length
+                penalty = next(penalties, None)
+            if state.finished:
+                break
+        else:
+            if state.stage.name == "Golden Goal":
+                state.add_score(goal[1] if goal else "w")
+        self.check_end()
+        return state
+
+    def check_tick(self, index: int) -> None:
+        """Check the state after a tick."""
+        state = self.state
+        self.check("stage went backwards", state.stage_index >= index)
+        self.check("negative score", min(state.w_score, state.b_score) >= 0)
+        if state.stage.end is not None and not state.finished:
+            length = state.stage.end - state.stage.start
+            self.check(f"time left {state.time_left} in {state.stage.name}",
+                       0 < state.time_left <= length)
+        return None
+
+    def check_end(self) -> None:
+        """Check the whole game once it has ended."""
+        state = self.state
+        timeline = state.timeline
+        self.check("didn't finish", state.finished)
+        kinds = [kind for seconds, kind, data in self.events]
+        self.check("didn't record one end", kinds.count("end") == 1)
+        self.check("recorded events after the end", kinds[-1:] == ["end"])
+
+        indexes = [data["index"] for seconds, kind, data in self.events
+                   if kind == "stage"]
+        self.check("skipped a stage",
+                   indexes == list(range(1, len(indexes) + 1)))
+        for seconds, kind, data in self.events:
+            if kind == "stage":
+                stage = timeline.stages[data["index"]]
+                self.check(f"entered {stage.name} late",
+                           seconds == stage.start or not self.every_second)
+
+        score = {"w": 0, "b": 0}
+        regulation = None  # Scores when the second half ended
+        for seconds, kind, data in self.events:
+            if kind == "score":
+                score[data["colour"]] += 1
+            if regulation is None and (seconds >= timeline.length() or
+                                       kind == "end"):
+                regulation = dict(score)
+        self.check("score doesn't match events",
+                   (score["w"], score["b"]) == (state.w_score,
+                                                state.b_score))
+        went_over = state.stage_index >= timeline.regulation
+        self.check("overtime played when not tied",
+                   not went_over or regulation["w"] == regulation["b"])
+        self.check("tied game ended without overtime",
+                   went_over or state.overtime == "No Overtime" or
+                   regulation["w"] != regulation["b"])
+        if state.overtime != "No Overtime":
+            self.check("game ended tied", not state.tied())
+
+        # Penalties are only served during play
+        given = {data["key"]: seconds for seconds, kind, data in self.events
+                 if kind == "penalty"}
+        for seconds, kind, data in self.events:
+            if kind == "penalty_end" and self.every_second:
+                served = self.play_time(given[data["key"]], seconds)
+                self.check(f"penalty {data['key']} served {served} s",
+                           served == self.lengths[data["key"]])
+        return None
+
+    def play_time(self, start: int, end: int) -> int:
+        """Return the seconds of play between two times, without breaks."""
+        breaks = sum(max(min(end, stage.end) - max(start, stage.start), 0)
+                     for stage in self.state.timeline.stages
+                     if stage.name not in PLAYING and stage.end is not None)
+        return end - start - breaks
+
+
+def tournament_day(games: int = 100, teams: int = 16, courts: int = 3,
+                   seed: int = 0, every_second: bool = True) -> dict:
+    """Play a day of round-robin games and report the throughput.
+
+    Returns the games played, games per second, ticks, violations,
+    the number of games that ended in each stage, and the standings
+    """
+    rng = random.Random(seed)
+    names = [f"T{i:02}" for i in range(1, teams + 1)]
+    setup = {"time": 10, "half": 2}
+    fixtures = schedule(round_robin(names), courts, game_slot(setup))[:games]
+
+    standings = Standings()
+    violations = []
+    ended_in = {}
+    ticks = 0
+    start = time.perf_counter()
+    for fixture in fixtures:
+        game_setup = {**setup, "overtime": rng.choice(OVERTIMES),
+                      "ot_time": 5, "ot_break": 1}
+        simulation = Simulation(fixture.input_args(game_setup),
+                                random_goals(rng, 1800), every_second,
+                                random_penalties(rng, 1800))
+        state = simulation.run()
+        standings.add_result(state.result())
+        violations += simulation.violations
+        ticks += simulation.ticks
+        ended_in[state.stage.name] = ended_in.get(state.stage.name, 0) + 1
+    taken = time.perf_counter() - start
+    return {"games": len(fixtures), "games_per_sec": len(fixtures) / taken,
+            "ticks": ticks, "violations": violations, "ended_in": ended_in,
+            "standings": standings}
+
+
+if __name__ == "__main__":
+    import sys
+
+    report = tournament_day(every_second="jump" not in sys.argv)
+    print(f"{report['games']} games, {report['ticks']} ticks, "
+          f"{report['games_per_sec']:.0f} games/sec")
+    print("Ended in:", report["ended_in"])
+    for violation in report["violations"]:
+        print(violation)
+    print(f"{len(report['violations'])} violations")
+    for team, row in report["standings"].table()[:3]:
+        print(team, row)
@@ -0,0 +1,212 @@
+"""Standings table for an underwater hockey tournament.
+
+v1 - Points, goal difference and head-to-head, updated per result
+v1.1 - Can be built from a results database as well as results.json
+v1.2 - Head-to-head is points among all the tied teams, not pairwise
+"""
+
+import json
+import os
+import tkinter as tk
+from tkinter import ttk
+from itertools import groupby
+from custom_style import get_style
+from results_store import open_results
+
+# Columns of each team's row, in table order
+COLUMNS = ("played", "won", "drawn", "lost", "for", "against", "points")
+
+
+class Standings:
+    """Ladder of teams, updated in constant time as each result is saved.
+
+    Ranked by points, then goal difference, then goals scored, then the
+    points each team took off the others it is still tied with.
+    """
+
+    def __init__(self, win: int = 3, draw: int = 1, loss: int = 0) -> None:
+        """Create empty standings.
+
+        win/draw/loss: points for each result
+        """
+        self.points = {"won": win, "drawn": draw, "lost": loss}
+        self.rows = {}  # Team name to dict of COLUMNS
+        self.head_to_head = {}  # (team, opponent) to points against them
+        self.version = 0  # Goes up with each result, so views can tell
+
+    def row(self, team: str) -> dict:
+        """Return a team's row, adding it if new."""
+        if team not in self.rows:
+            self.rows[team] = dict.fromkeys(COLUMNS, 0)
+        return self.rows[team]
+
+    def add_result(self, result: dict) -> None:
+        """Add a saved game result to the standings.
+
+        result: dict with w_team, b_team, w_score and b_score
+        """
+        self.add_game(result["w_team"], result["w_score"],
+                      result["b_team"], result["b_score"])
+        return None
+
+    def add_game(self, team: str, score: int, opponent: str,
+                 opponent_score: int) -> None:
+        """Add one game, for both teams in it."""
+        for us, ours, them, theirs in ((team, score, opponent,
+                                        opponent_score),
+                                       (opponent, opponent_score, team,
+                                        score)):
+            if ours > theirs:
+                outcome = "won"
+            elif ours == theirs:
+                outcome = "drawn"
+            else:
+                outcome = "lost"
+            row = self.row(us)
+            row["played"] += 1
+            row[outcome] += 1
+            row["for"] += ours
+            row["against"] += theirs
+            row["points"] += self.points[outcome]
+            self.head_to_head[us, them] = (self.head_to_head.get((us, them), 0)
+                                           + self.points[outcome])
+        self.version += 1
+        return None
+
+    def tie_key(self, pair: tuple) -> tuple:
+        """Return the sort key of a (team, row) pair before head-to-head,
+        the better team first.
+        """
+        row = pair[1]
+        return (-row["points"], -row["difference"], -row["for"])
+
+    def head_to_head_points(self, team: str, tied: list[str]) -> int:
+        """Return the points a team took off the other tied teams."""
+        return sum(self.head_to_head.get((team, other), 0)
+                   for other in tied if other != team)
+
+    def table(self) -> list[tuple[str, dict]]:
+        """Return (team, row) pairs in ladder order.
+
+        Each row also has the goal difference.
+        """
+        rows = [(team, {**row, "difference": row["for"] - row["against"]})
+                for team, row in self.rows.items()]
+        table = []
+        for key, group in groupby(sorted(rows, key=self.tie_key),
+                                  key=self.tie_key):
+            group = list(group)
+            if len(group) > 1:
+                # A mini-table of the games between the tied teams, so
+                # the order is the same however many are tied
+                tied = [team for team, row in group]
+                group.sort(key=lambda pair: -self.head_to_head_points(
+                    pair[0], tied))
+            table.extend(group)
+        return table
+
+    def rows_for_broadcast(self) -> list[list]:
+        """Return the table as lists, in ladder order, to send as JSON."""
+        return [[team] + [row[key] for key in (*COLUMNS, "difference")]
+                for team, row in self.table()]
+
+    @classmethod
+    def from_results(cls, results: dict, **points) -> "Standings":
+        """Build standings from every game in a results.json dict.
+
+        save_error results aren't counted.
+        points: win/draw/loss points, as for Standings()
+        """
+        standings = cls(**points)
+        for key, result in results.items():
+            if key != "save_error":
+                standings.add_result(result)
+        return standings
+
+    @classmethod
+    def from_file(cls, save_fp: str = "results.json",
+                  **points) -> "Standings":
+        """Build standings from the file results are saved to, a .db
+        database or a results.json file, empty if there are none.
+        """
+        if os.path.splitext(save_fp)[1].lower() in (".db", ".sqlite"):
+            store = open_results(save_fp)
+            try:
+                results = store.results()
+            finally:
+                store.close()
+        else:
+            try:
+                with open(save_fp, "r") as f:
+                    results = json.load(f)
+            except (FileNotFoundError, UnicodeDecodeError, ValueError):
+                # Not saved yet, or not a results.json file
+                results = {}
+        return cls.from_results(results, **points)
+
+
+class StandingsFrame(ttk.Frame):
+    """Frame showing the live standings table."""
+
+    def __init__(self, master: tk.Tk | ttk.Frame, standings: Standings,
+                 refresh_ms: int = 1000) -> None:
+        """Create standings frame.
+
+        standings: Standings to show, redrawn when it changes
+        refresh_ms: how often to check for new results
+        """
+        super().__init__(master)
+        self.style = get_style(self)
+        self.standings = standings
+        self.refresh_ms = refresh_ms
+        self.shown = None  # Version of the standings shown
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        headings = ("Team", "P", "W", "D", "L", "GF", "GA", "GD", "Pts")
+        self.tree = ttk.Treeview(self, columns=headings, show="headings")
+        for heading in headings:
+            self.tree.heading(heading, text=heading)
+            self.tree.column(heading, width=60 if heading != "Team" else 120,
+                             anchor="center")
+        self.tree.grid(row=0, column=0, sticky="NSWE")
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Redraw the table if there are new results, then check again."""
+        if self.shown != self.standings.version:
+            self.tree.delete(*self.tree.get_children())
+            for team, row in self.standings.table():
+                self.tree.insert("", "end", values=(
+                    team, row["played"], row["won"], row["drawn"],
+                    row["lost"], row["for"], row["against"],
+                    row["difference"], row["points"]))
+            self.shown = self.standings.version
+        self.after(self.refresh_ms, self.refresh)
+        return None
+
+
+if __name__ == "__main__":
+    # Time adding a result, and rebuilding from a season of results
+    import random
+    import time
+
+    teams = [f"T{i:02}" for i in range(64)]
+    results = {"save_error": []}
+    for game in range(1, 20001):
+        w_team, b_team = random.sample(teams, 2)
+        results[str(game)] = {"w_team": w_team, "b_team": b_team,
+                              "w_score": random.randrange(6),
+                              "b_score": random.randrange(6)}
+
+    start = time.perf_counter()
+    standings = Standings.from_results(results)
+    taken = time.perf_counter() - start
+    print(f"Rebuild 20000 results: {taken*1000:.1f} ms, "
+          f"{taken/20000*1e6:.2f} us per result")
+    start = time.perf_counter()
+    standings.table()
+    print(f"Sort table: {(time.perf_counter()-start)*1000:.2f} ms")
+    for team, row in standings.table()[:3]:
+        print(team, row)
@@ -0,0 +1,149 @@
+"""Profiles each tick of the game clock, in fixed-size ring buffers.
+
+v1 - Wake-up lateness, handler time and Tcl calls per tick, as percentiles
+"""
+
+import json
+import time
+import tkinter as tk
+from array import array
+
+PERCENTILES = (50, 90, 99, 100)
+
+
+class RingBuffer:
+    """Keeps the last size values, overwriting the oldest."""
+
+    def __init__(self, size: int = 1024) -> None:
+        self.data = array("q", bytes(8 * size))
+        self.size = size
+        self.count = 0  # Values ever added
+
+    def add(self, value: int) -> None:
+        """Add a value, replacing the oldest if full."""
+        self.data[self.count % self.size] = value
+        self.count += 1
+        return None
+
+    def values(self) -> list[int]:
+        """Return the values kept, oldest first."""
+        if self.count <= self.size:
+            return self.data[:self.count].tolist()
+        start = self.count % self.size
+        return (self.data[start:] + self.data[:start]).tolist()
+
+    def percentiles(self, percentiles: tuple = PERCENTILES) -> dict:
+        """Return {percentile: value} by nearest rank, empty if no values."""
+        values = sorted(self.values())
+        if not values:
+            return {}
+        return {p: values[max(-(-p * len(values) // 100) - 1, 0)]
+                for p in percentiles}
+
+
+class TclCounter:
+    """Stands in for a tkinter interpreter, counting calls made into it."""
+
+    def __init__(self, tkapp) -> None:
+        self.tkapp = tkapp
+        self.calls = 0
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.tkapp, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+class TickProfiler:
+    """Records how late each clock tick was, how long it took, and how
+    many Tcl calls it made.
+
+    Set as a GameClock's profiler, and instrument() the widgets, variables
+    and styles the tick uses. Only the last size ticks are kept, so it can
+    be left running for a whole day.
+    """
+
+    def __init__(self, size: int = 1024) -> None:
+        self.late = RingBuffer(size)  # Wake-up after its second, ns
+        self.duration = RingBuffer(size)  # Time in the callback, ns
+        self.tcl_calls = RingBuffer(size)  # Tcl calls made by the callback
+        self.counter = None  # TclCounter, once instrumented
+        self.started_ns = 0
+        self.calls_before = 0
+
+    def instrument(self, *objects) -> None:
+        """Count Tcl calls made through widgets, variables or styles.
+
+        All of them must belong to the same Tk interpreter.
+        """
+        for obj in objects:
+            name = "_tk" if isinstance(obj, tk.Variable) else "tk"
+            tkapp = getattr(obj, name)
+            if isinstance(tkapp, TclCounter):
+                self.counter = tkapp
+                continue
+            if self.counter is None:
+                self.counter = TclCounter(tkapp)
+            setattr(obj, name, self.counter)
+        return None
+
+    def begin(self, late_ns: int) -> None:
+        """Start timing a tick that woke up late_ns after its second."""
+        self.late.add(late_ns)
+        if self.counter is not None:
+            self.calls_before = self.counter.calls
+        self.started_ns = time.perf_counter_ns()
+        return None
+
+    def end(self) -> None:
+        """Finish timing the tick."""
+        self.duration.add(time.perf_counter_ns() - self.started_ns)
+        if self.counter is not None:
+            self.tcl_calls.add(self.counter.calls - self.calls_before)
+        return None
+
+    def summary(self) -> dict:
+        """Return the percentiles of each measure, times in ms."""
+        return {
+            "ticks": self.late.count,
+            "late_ms": {p: ns / 1e6 for p, ns in
+                        self.late.percentiles().items()},
+            "duration_ms": {p: ns / 1e6 for p, ns in
+                            self.duration.percentiles().items()},
+            "tcl_calls": self.tcl_calls.percentiles()
+        }
+
+    def dump(self, fp: str | None = None) -> None:
+        """Print the summary, and append it to a JSON-lines file if given."""
+        summary = self.summary()
+        print(f"{summary['ticks']} ticks")
+        for key in ("late_ms", "duration_ms", "tcl_calls"):
+            print(f"  {key}: " + ", ".join(f"p{p} {value:g}" for p, value
+                                           in summary[key].items()))
+        if fp is not None:
+            with open(fp, "a") as f:
+                f.write(json.dumps(summary) + "\n")
+        return None
+
+
+if __name__ == "__main__":
+    # Profile a clock with a busy callback, sleeping instead of after()
+    import random
+    from game_clock import GameClock
+
+    def callback(elapsed: int) -> None:
+        time.sleep(random.random() / 200)
+
+    profiler = TickProfiler(size=64)
+    clock = GameClock(callback=callback)
+    clock.profiler = profiler
+    clock.start()
+    while clock.elapsed() < 3:
+        time.sleep(clock.ms_to_next_second() / 1000)
+        clock.tick()
+    profiler.dump()
@@ -0,0 +1,84 @@
+"""The timeline of stages in an underwater hockey game.
+
+v1 - Precomputes stage start/end times, looks up the stage with bisect
+"""
+
+from bisect import bisect_right
+from collections import namedtuple
+
+# name: label shown to the user, e.g. 'First Half'
+# type: 'Normal', 'Break' or 'Timeout', sets the background colour
+# start/end: seconds since the game started, end is None if open-ended
+# if_tied: stage is only played if the scores are tied when it starts
+Stage = namedtuple("Stage", ["name", "type", "start", "end", "if_tied"])
+
+
+class Timeline:
+    """All the stages a game could go through, built once at game start.
+
+    Overtime stages are included, and the game only enters them if the
+    score is tied, so the timeline never has to be rebuilt.
+    """
+
+    def __init__(self, time: int, half: int, overtime: str = "No Overtime",
+                 ot_time: int = 0, ot_break: int = 0) -> None:
+        """Create timeline.
+
+        time: length of each half of the game in minutes
+        half: length of half-time in minutes
+        overtime: "No Overtime", "Extra Time" or "Golden Goal"
+        ot_time: length of each half of overtime in minutes
+        ot_break: time between overtime halves in minutes
+        """
+        self.stages = []
+        self.add("First Half", "Normal", time)
+        self.add("Half-Time", "Break", half)
+        self.add("Second Half", "Normal", time)
+        self.regulation = len(self.stages)  # Number of non-overtime stages
+
+        if overtime == "Extra Time":
+            self.add("Extra Time Break", "Timeout", ot_break, True)
+            self.add("Extra Time 1st Half", "Timeout", ot_time)
+            self.add("Extra Half-Time", "Timeout", ot_break)
+            self.add("Extra Time 2nd Half", "Timeout", ot_time)
+        if overtime in ("Extra Time", "Golden Goal"):
+            self.add("Golden Goal", "Timeout", None, True)
+
+        # Sorted start times, used to bisect
+        self.starts = [stage.start for stage in self.stages]
+
+    def add(self, name: str, stage_type: str, length: int | None,
+            if_tied: bool = False) -> None:
+        """Add a stage to the end of the timeline.
+
+        length: minutes, or None if the stage has no end
+        """
+        start = self.stages[-1].end if self.stages else 0
+        end = None if length is None else start + length*60
+        self.stages.append(Stage(name, stage_type, start, end, if_tied))
+        return None
+
+    def lookup(self, seconds: int) -> tuple[int, int | None]:
+        """Find the stage at a time in the game.
+
+        Returns the stage index and the seconds remaining in it.
+        Remaining is None in an open-ended stage, and the index is
+        len(stages) once the last stage is over
+        """
+        index = bisect_right(self.starts, seconds) - 1
+        end = self.stages[index].end
+        if end is None:
+            return index, None
+        if seconds >= end:
+            # Only possible after the last stage
+            return len(self.stages), 0
+        return index, end - seconds
+
+    def length(self, overtime: bool = False) -> int:
+        """Return the length of the game in seconds.
+
+        overtime: include extra time, the worst case length
+        Golden goal isn't included as it has no set length
+        """
+        stages = self.stages if overtime else self.stages[:self.regulation]
+        return max(stage.end for stage in stages if stage.end is not None)
@@ -0,0 +1,94 @@
+"""A queue of deadlines, e.g. for penalties, kept in a heap.
+
+v1 - Any number of timers, added and fired in O(log n)
+"""
+
+import heapq
+from itertools import count
+
+
+class TimerQueue:
+    """Timers that call back when the game clock reaches their deadline.
+
+    Timers are kept in a heap by deadline, so adding one and firing the
+    next are O(log n), and the next deadline is always at the top.
+    Cancelled timers are left in the heap and skipped when they reach the
+    top, so cancelling is O(1).
+    """
+
+    def __init__(self) -> None:
+        self.heap = []  # [deadline_ns, order, key, callback]
+        self.timers = {}  # Heap entry of each timer still waiting, by key
+        self.order = count()  # Fires timers with equal deadlines in order
+
+    def add(self, key, deadline_ns: int, callback) -> None:
+        """Add a timer, replacing any with the same key.
+
+        deadline_ns: game clock time it fires at
+        callback: called with the key when it fires
+        """
+        self.cancel(key)
+        entry = [deadline_ns, next(self.order), key, callback]
+        heapq.heappush(self.heap, entry)
+        self.timers[key] = entry
+        return None
+
+    def cancel(self, key) -> None:
+        """Stop a timer from firing, if it is waiting."""
+        entry = self.timers.pop(key, None)
+        if entry is not None:
+            entry[3] = None
+        return None
+
+    def next_deadline(self) -> int | None:
+        """Return the deadline of the next timer to fire, None if none."""
+        while self.heap and self.heap[0][3] is None:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def fire(self, now_ns: int) -> None:
+        """Fire every timer whose deadline has come, in deadline order."""
+        while self.heap and self.heap[0][0] <= now_ns:
+            deadline_ns, order, key, callback = heapq.heappop(self.heap)
+            if callback is not None:
+                del self.timers[key]
+                callback(key)
+        return None
+
+    def deadline(self, key) -> int | None:
+        """Return the deadline of a waiting timer, None if it isn't."""
+        entry = self.timers.get(key)
+        return entry[0] if entry is not None else None
+
+    def delay(self, delay_ns: int) -> None:
+        """Push back every waiting timer, e.g. while the game is stopped."""
+        self.heap = list(self.timers.values())
+        for entry in self.heap:
+            entry[0] += delay_ns
+        heapq.heapify(self.heap)
+        return None
+
+    def __len__(self) -> int:
+        return len(self.timers)
+
+
+if __name__ == "__main__":
+    # Time adding, cancelling and firing many timers at once
+    import random
+    import time
+
+    for timers in (10, 1000, 100000):
+        queue = TimerQueue()
+        fired = []
+        start = time.perf_counter()
+        for i in range(timers):
+            queue.add(i, random.randrange(10**12), fired.append)
+        added = time.perf_counter() - start
+        for i in range(0, timers, 3):
+            queue.cancel(i)
+        start = time.perf_counter()
+        queue.fire(10**12)
+        taken = time.perf_counter() - start
+        assert len(fired) == timers - len(range(0, timers, 3))
+        print(f"{timers} timers: add {added/timers*1e6:.2f} us, "
+              f"fire {taken/len(fired)*1e6:.2f} us each")
@@ -0,0 +1,103 @@
+"""Display fields of a window, only pushed to Tk when they change.
+
+v1 - Caches the text shown in each field and sets changes in one batch
+v1.1 - Listeners are told of each batch, for views without variables
+"""
+
+import tkinter as tk
+
+
+class ViewModel:
+    """The fields a game window shows, e.g. time, stage and scores.
+
+    Each field is a tkinter variable that labels in any number of windows
+    are bound to, and every set() redraws all of them. Here set() only
+    remembers the new value, and flush() sets just the variables whose
+    value changed, once at the end of each handler.
+    """
+
+    def __init__(self, variables: dict[str, tk.Variable]) -> None:
+        """Create view model.
+
+        variables: tkinter variable of each field, by field name
+        """
+        self.variables = variables
+        self.shown = {name: var.get() for name, var in variables.items()}
+        self.pending = {}  # Changed values waiting for flush()
+        # Called with {name: value} of the fields changed by each flush(),
+        # e.g. by a canvas that draws the fields itself
+        self.listeners = []
+        self.sets = 0  # Variables set in Tk
+        self.skipped = 0  # Values dropped as they were already shown
+
+    def set(self, name: str, value) -> None:
+        """Show a value in a field at the next flush()."""
+        if value == self.shown[name]:
+            self.pending.pop(name, None)
+            self.skipped += 1
+        else:
+            self.pending[name] = value
+        return None
+
+    def get(self, name: str):
+        """Return the value a field will show, without asking Tk."""
+        return self.pending.get(name, self.shown[name])
+
+    def flush(self) -> None:
+        """Set the Tk variables of every field that changed."""
+        if not self.pending:
+            return None
+        for name, value in self.pending.items():
+            self.variables[name].set(value)
+            self.shown[name] = value
+        self.sets += len(self.pending)
+        changed, self.pending = self.pending, {}
+        for listener in self.listeners:
+            listener(changed)
+        return None
+
+
+if __name__ == "__main__":
+    # Count the Tcl calls and time of rendering a game, with and without
+    # the view model, with every variable bound to several labels
+    import time
+    from tick_profiler import TclCounter
+
+    def render(fields, view: ViewModel | None, tick: int) -> None:
+        """Render every field for one tick, as InputFrame does."""
+        values = {"real": f"12:{tick//60 % 60:02}:{tick % 60:02}",
+                  "time": f"{(600 - tick % 600)//60:02}:{tick % 60:02}",
+                  "stage": "First Half" if tick < 600 else "Second Half",
+                  "w_score": tick // 300, "b_score": tick // 400}
+        if view is None:
+            for name, value in values.items():
+                fields[name].set(value)
+        else:
+            for name, value in values.items():
+                view.set(name, value)
+            view.flush()
+
+    root = tk.Tcl()
+    # A no-op trace per label stands in for Tk redrawing a bound label
+    root.eval("proc redraw args {}")
+    for outputs in (1, 3, 6):
+        results = []
+        for use_view in (False, True):
+            fields = {name: tk.StringVar(root, "") for name in
+                      ("real", "time", "stage")}
+            fields.update(w_score=tk.IntVar(root, 0),
+                          b_score=tk.IntVar(root, 0))
+            counter = TclCounter(root.tk)
+            for var in fields.values():
+                for label in range(1 + outputs):
+                    root.eval(f"trace add variable {var} write redraw")
+                var._tk = counter
+            view = ViewModel(fields) if use_view else None
+            start = time.perf_counter()
+            for tick in range(1200):
+                render(fields, view, tick)
+            taken = time.perf_counter() - start
+            results.append((counter.calls / 1200, taken / 1200 * 1e6))
+        (naive_calls, naive_us), (view_calls, view_us) = results
+        print(f"{outputs} outputs: {naive_calls:.1f} -> {view_calls:.1f} "
+              f"Tcl calls/tick, {naive_us:.1f} -> {view_us:.1f} us/tick")
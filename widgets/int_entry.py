@@ -36,8 +36,8 @@ class IntEntry(ttk.Frame):
         self.ent.grid(row=1, column=0, sticky="NSWE")
 
         if hasattr(self.master, "update"):
-            self.master.master.bind("<Key>",
-                                    lambda event: self.master.update())
+            # Only when the value changes, not on every key in the window
+            self.var.trace_add("write", lambda *args: self.master.update())
 
     def validate(self, value: str) -> bool:
         """Validate if the input is an integer within range.